@@ -0,0 +1,115 @@
+import sys
+import time
+import json
+import random
+import argparse
+import threading
+import http.client
+from urllib.parse import urlparse
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+class Client(threading.Thread):
+    """单个并发客户端：保持一个 HTTP 连接，按比例发送读写请求"""
+
+    def __init__(self, host, port, deadline, write_ratio, seed):
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.deadline = deadline
+        self.write_ratio = write_ratio
+        self.random = random.Random(seed)
+        self.latencies = []
+        self.statuses = {}
+        self.errors = 0
+
+    def request(self, conn, method, path, payload=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body else {}
+        start = time.perf_counter()
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        data = response.read()
+        self.latencies.append(time.perf_counter() - start)
+        self.statuses[response.status] = self.statuses.get(response.status, 0) + 1
+        return response.status, json.loads(data) if data else None
+
+    def run(self):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        while time.perf_counter() < self.deadline:
+            try:
+                if self.random.random() < self.write_ratio:
+                    self.write(conn)
+                else:
+                    self.read(conn)
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        conn.close()
+
+    def read(self, conn):
+        choice = self.random.random()
+        if choice < 0.5:
+            self.request(conn, "GET", f"/students?page={self.random.randint(1, 20)}&page_size=50")
+        elif choice < 0.8:
+            self.request(conn, "GET", "/students?Gender=Female&page_size=20")
+        else:
+            self.request(conn, "GET", "/stats?by=Department")
+
+    def write(self, conn):
+        # Read-modify-write with the record version; a 409 means another client won the race
+        status, page = self.request(conn, "GET", f"/students?page={self.random.randint(1, 20)}&page_size=10")
+        if status != 200 or not page["items"]:
+            return
+        record = self.random.choice(page["items"])
+        self.request(conn, "PUT", f"/students/{record['id']}",
+                     {"version": record["version"], "Gender": self.random.choice(["Male", "Female"])})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for `python main.py --serve`")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=8, help="number of concurrent clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="test duration in seconds")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="fraction of operations that write")
+    args = parser.parse_args()
+
+    url = urlparse(args.url)
+    deadline = time.perf_counter() + args.duration
+    clients = [Client(url.hostname, url.port or 80, deadline, args.write_ratio, seed)
+               for seed in range(args.clients)]
+    start = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for client in clients for latency in client.latencies]
+    statuses = {}
+    for client in clients:
+        for status, count in client.statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+    errors = sum(client.errors for client in clients)
+
+    print(f"Clients: {args.clients}  Duration: {elapsed:.1f}s  Write ratio: {args.write_ratio}")
+    print(f"Requests: {len(latencies)}  Throughput: {len(latencies) / elapsed:.1f} req/s")
+    print(f"Latency p50: {percentile(latencies, 50) * 1000:.1f} ms  "
+          f"p95: {percentile(latencies, 95) * 1000:.1f} ms  "
+          f"p99: {percentile(latencies, 99) * 1000:.1f} ms")
+    print("Status codes: " + ", ".join(f"{status}={count}" for status, count in sorted(statuses.items())))
+    if errors:
+        print(f"Connection errors: {errors}")
+    return 0 if latencies else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,232 @@
 import sys
+import os
+import io
+import time
+import re
+import json
+import tempfile
+import threading
+import argparse
+import sqlite3
+import hashlib
+import hmac
+from collections import OrderedDict
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
 import pandas as pd
 from PyQt6.QtWidgets import (
     QApplication, QDialog, QMainWindow, QTableWidget, QTableWidgetItem,
     QVBoxLayout, QHBoxLayout, QWidget, QStatusBar, QPushButton, QLineEdit,
-    QInputDialog, QMessageBox, QLabel, QHeaderView, QMenu
+    QInputDialog, QMessageBox, QLabel, QHeaderView, QTableView, QComboBox,
+    QFrame, QListView, QProgressBar
+)
+from PyQt6.QtCore import (
+    QPoint, Qt, QSize, pyqtSignal, QFileSystemWatcher, QThread, QTimer, QAbstractTableModel, QAbstractListModel, QModelIndex
 )
-from PyQt6.QtCore import QPoint, Qt, QSize
 from PyQt6.QtGui import QPalette, QColor, QIcon
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from mpl_toolkits.mplot3d import Axes3D
 import matplotlib.pyplot as plt
 from matplotlib.font_manager import FontProperties
 import pyqtgraph as pg
 import numpy as np
 
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:  # 未安装 pypinyin 时按字符顺序排序
+    lazy_pinyin = None
+
 plt.rcParams['font.sans-serif'] = ['SimHei']
 plt.rcParams['axes.unicode_minus'] = False
 
+DATA_FILE = os.path.join("data", "student_dataset_example.csv")
+ACCOUNT_TEXT_FILE = os.path.join("data", "user.txt")
+ACCOUNT_DB_FILE = os.path.join("data", "users.db")
+COLUMNS_ORDER = ["Name", "Gender", "Ethnicity", "Department", "Major", "Province"]
+
+
+def read_roster(file_path):
+    if file_path.lower().endswith((".xlsx", ".xls")):
+        return pd.read_excel(file_path)
+    return pd.read_csv(file_path)
+
+
+def write_roster(df, file_path):
+    # 先写临时文件再替换，其他进程不会读到写了一半的文件
+    directory = os.path.dirname(file_path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=os.path.splitext(file_path)[1])
+    os.close(fd)
+    try:
+        if file_path.lower().endswith((".xlsx", ".xls")):
+            df.to_excel(tmp_path, index=False)
+        else:
+            df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, file_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def file_signature(file_path):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def diff_rows(old_df, new_df):
+    """
+    按每行内容哈希比较两个版本的数据。
+    返回 (new_df, changed, inserted, deleted)：new_df 中未变化的行沿用 old_df 的行号，
+    修改过的行沿用被替换行的行号，新增行分配新行号。
+    """
+    old_labels = old_df.index.to_numpy()
+    old_hashes = pd.util.hash_pandas_object(old_df, index=False).to_numpy()
+    new_hashes = pd.util.hash_pandas_object(new_df, index=False).to_numpy()
+
+    # Same content may appear several times; match the k-th copy to the k-th copy
+    old_keys = pd.DataFrame({"hash": old_hashes, "label": old_labels})
+    old_keys["occurrence"] = old_keys.groupby("hash").cumcount()
+    new_keys = pd.DataFrame({"hash": new_hashes, "position": np.arange(len(new_df))})
+    new_keys["occurrence"] = new_keys.groupby("hash").cumcount()
+    matched = new_keys.merge(old_keys, on=["hash", "occurrence"], how="left").sort_values("position")
+    # copy=True: pandas may hand back a read-only view, and labels is written below
+    labels = matched["label"].fillna(-1).to_numpy(dtype=np.int64, copy=True)
+    new_unmatched = labels == -1
+    old_unmatched = ~np.isin(old_labels, labels[~new_unmatched])
+
+    # An unmatched new row replacing an unmatched old row right after the same
+    # surviving row is an in-place edit rather than a delete plus an insert
+    def anchors(row_labels, unmatched):
+        anchor = pd.Series(np.where(unmatched, np.nan, row_labels)).ffill().fillna(-1)
+        frame = pd.DataFrame({"anchor": anchor.to_numpy()[unmatched], "row": np.flatnonzero(unmatched)})
+        frame["k"] = frame.groupby("anchor").cumcount()
+        return frame
+
+    old_side = anchors(old_labels, old_unmatched)
+    new_side = anchors(labels, new_unmatched)
+    pairs = new_side.merge(old_side, on=["anchor", "k"], suffixes=("_new", "_old"))
+
+    changed = old_labels[pairs["row_old"].to_numpy()].tolist()
+    labels[pairs["row_new"].to_numpy()] = changed
+    deleted = np.setdiff1d(old_labels[old_unmatched], changed).tolist()
+    still_unmatched = np.flatnonzero(labels == -1)
+    next_label = int(old_labels.max()) + 1 if len(old_labels) else 0
+    inserted = list(range(next_label, next_label + len(still_unmatched)))
+    labels[still_unmatched] = inserted
+
+    new_df = new_df.copy()
+    new_df.index = pd.Index(labels)
+    return new_df, changed, inserted, deleted
+
+
+class AccountStore:
+    """SQLite 账户库：按用户名主键查找单条记录，密码以加盐 PBKDF2 哈希保存"""
+    ITERATIONS = 100_000
+
+    def __init__(self, db_path=ACCOUNT_DB_FILE):
+        self.db_path = db_path
+        self.conn = None
+
+    def exists(self):
+        return os.path.exists(self.db_path)
+
+    @staticmethod
+    def open_database(path):
+        conn = sqlite3.connect(path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS accounts (
+                username TEXT PRIMARY KEY,
+                salt BLOB NOT NULL,
+                password_hash BLOB NOT NULL,
+                iterations INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+        return conn
+
+    def connect(self):
+        # 首次查询时才打开数据库
+        if self.conn is None:
+            self.conn = self.open_database(self.db_path)
+        return self.conn
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    @staticmethod
+    def hash_password(password, salt, iterations):
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+
+    def make_record(self, username, password):
+        salt = os.urandom(16)
+        return username, salt, self.hash_password(password, salt, self.ITERATIONS), self.ITERATIONS
+
+    def set_password(self, username, password):
+        conn = self.connect()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO accounts VALUES (?, ?, ?, ?)",
+                         self.make_record(username, password))
+
+    def verify(self, username, password):
+        row = self.connect().execute(
+            "SELECT salt, password_hash, iterations FROM accounts WHERE username = ?", (username,)
+        ).fetchone()
+        if row is None:
+            # Hash anyway so unknown usernames take as long as wrong passwords
+            self.hash_password(password, b"\0" * 16, self.ITERATIONS)
+            return False
+        salt, password_hash, iterations = row
+        return hmac.compare_digest(self.hash_password(password, salt, iterations), password_hash)
+
+    def migrate_from_text(self, text_path=ACCOUNT_TEXT_FILE):
+        """从 username:password 格式的明文文件导入账户，返回导入数量"""
+        accounts = {}
+        with open(text_path, "r", encoding="utf-8") as file:
+            for line in file:
+                if ":" in line:
+                    username, password = line.strip().split(":", 1)
+                    accounts[username] = password
+                elif line.strip():
+                    print(f"Warning:Skipping malformed line: {line.strip()}")
+
+        if not accounts:
+            return 0
+
+        # pbkdf2_hmac releases the GIL, so hashing spreads across threads
+        with ThreadPoolExecutor() as executor:
+            records = list(executor.map(lambda item: self.make_record(*item), accounts.items()))
+        if self.exists():
+            conn = self.connect()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO accounts VALUES (?, ?, ?, ?)", records)
+            return len(records)
+
+        # 新建账户库时先写临时文件再替换，导入失败不会留下空的账户库
+        directory = os.path.dirname(self.db_path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".db")
+        os.close(fd)
+        try:
+            conn = self.open_database(tmp_path)
+            try:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO accounts VALUES (?, ?, ?, ?)", records)
+            finally:
+                conn.close()
+            os.replace(tmp_path, self.db_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return len(records)
+
 
 class LoginDialog(QDialog):
     def __init__(self):
@@ -25,9 +234,9 @@ class LoginDialog(QDialog):
         self.setWindowTitle("Login")
         self.setFixedSize(400, 250)
 
-        # Read account File
+        # Accounts are looked up in the store only when the user logs in
         self.total_failed_attempts = 0
-        self.accounts = self.load_accounts()
+        self.account_store = AccountStore()
 
         # Create layout
         layout = QVBoxLayout()
@@ -107,24 +316,18 @@ class LoginDialog(QDialog):
             }
         """)
 
-    def load_accounts(self):
-        file_path = "data/user.txt"
-        accounts = {}
-        try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                for line in file:
-                    if ":" in line:
-                        username, password = line.strip().split(":", 1)
-                        accounts[username] = password
-                    else:
-                        print(f"Warning:Skipping malformed line: {line.strip()}")
-            return accounts
-        except FileNotFoundError:
-            QMessageBox.critical(self, "Error", "Account file (user.txt) not found！")
-            return {}
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error reading account file：{str(e)}")
-            return {}
+    def open_account_store(self):
+        if self.account_store.exists():
+            return True
+        # Hashing every account takes a while, so the legacy plaintext file is
+        # imported from the command line rather than on the GUI thread
+        if os.path.exists(ACCOUNT_TEXT_FILE):
+            QMessageBox.critical(self, "Error", f"Account store ({ACCOUNT_DB_FILE}) not found！\n"
+                                                f"Import {ACCOUNT_TEXT_FILE} first with:\n"
+                                                f"python main.py --migrate-accounts {ACCOUNT_TEXT_FILE}")
+        else:
+            QMessageBox.critical(self, "Error", "Account store (users.db) not found！")
+        return False
 
     def validate_input(self):
         username = self.username_input.text()
@@ -152,11 +355,15 @@ class LoginDialog(QDialog):
             return
 
         # Validate username and password
-        if not self.accounts:
+        if not self.open_account_store():
+            return
+        try:
+            valid = self.account_store.verify(username, password)
+        except sqlite3.Error:
             QMessageBox.critical(self, "Error", "Unable to validate accounts. Please check the account file!")
             return
 
-        if username in self.accounts and self.accounts[username] == password:
+        if valid:
             QMessageBox.information(self, "Success", "Login successful!")
             self.accept()
         else:
@@ -175,40 +382,181 @@ class LoginDialog(QDialog):
             self.password_input.clear()
             self.login_button.setEnabled(False)
 
+class ValueCountsIndex:
+    """每列的取值及人数（按取值文本排序），按数据版本和显示的行缓存"""
+
+    def __init__(self):
+        self.columns = {}   # column -> (values, lowercased values, counts)
+        self.version = None
+
+    def clear(self):
+        self.columns.clear()
+
+    def get(self, df, column, version):
+        # version 变化（数据修改或表格显示的行变化）后缓存失效
+        if version != self.version:
+            self.columns.clear()
+            self.version = version
+        entry = self.columns.get(column)
+        if entry is None:
+            # Values are keyed by their display text so they match the table items
+            counts = df[column].fillna("No Data").astype(str).value_counts().sort_index()
+            values = counts.index.to_numpy(dtype=object)
+            lowered = pd.Series(values, dtype=object).str.lower().to_numpy(dtype=object)
+            entry = self.columns[column] = (values, lowered, counts.to_numpy())
+        return entry
+
+
+class ValueListModel(QAbstractListModel):
+    """筛选弹窗的取值列表，滚动时按页加载"""
+    PAGE_SIZE = 200
+    valueToggled = pyqtSignal(str, bool)
+
+    def __init__(self, values, counts, checked, parent=None):
+        super().__init__(parent)
+        self.values = values
+        self.counts = counts
+        self.checked = checked
+        self.loaded = 0
+        self.fetchMore(QModelIndex())
+
+    def set_values(self, values, counts):
+        self.beginResetModel()
+        self.values, self.counts = values, counts
+        self.loaded = min(self.PAGE_SIZE, len(values))
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.loaded < len(self.values)
+
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        count = min(self.PAGE_SIZE, len(self.values) - self.loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self.values[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{value}  ({self.counts[index.row()]})"
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Checked if value in self.checked else Qt.CheckState.Unchecked
+        return None
+
+    def flags(self, index):
+        return (Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+                | Qt.ItemFlag.ItemIsUserCheckable)
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.CheckStateRole:
+            return False
+        checked = Qt.CheckState(value) == Qt.CheckState.Checked
+        self.dataChanged.emit(index, index, [role])
+        self.valueToggled.emit(self.values[index.row()], checked)
+        return True
+
+
+class FilterPopup(QFrame):
+    """列标题的排序/筛选弹窗：搜索框加按页加载的取值列表"""
+
+    def __init__(self, header, logical_index, values, lowered, counts):
+        super().__init__(header, Qt.WindowType.Popup)
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.setFrameShape(QFrame.Shape.StyledPanel)
+        self.header = header
+        self.logical_index = logical_index
+        self.all_values = (values, lowered, counts)
+        self.matched = self.all_values
+        self.search_text = ""
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(6, 6, 6, 6)
+
+        # Sort options
+        sort_layout = QHBoxLayout()
+        buttons = [("Sort Ascending", lambda: header.sortRequested.emit(logical_index, True, False)),
+                   ("Sort Descending", lambda: header.sortRequested.emit(logical_index, False, False))]
+        if header.isSortIndicatorShown():
+            buttons += [("Then Ascending", lambda: header.sortRequested.emit(logical_index, True, True)),
+                        ("Then Descending", lambda: header.sortRequested.emit(logical_index, False, True)),
+                        ("Clear Sort", header.sortCleared.emit)]
+        for text, handler in buttons:
+            button = QPushButton(text)
+            button.clicked.connect(lambda _, h=handler: (self.close(), h()))
+            sort_layout.addWidget(button)
+        layout.addLayout(sort_layout)
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText(f"Search {len(values)} values...")
+        self.search_input.textChanged.connect(self.search_values)
+        layout.addWidget(self.search_input)
+
+        # 列表按需取页，打开时间与取值数量无关
+        checked = header.filters.setdefault(logical_index, set())
+        self.model = ValueListModel(values, counts, checked, self)
+        self.model.valueToggled.connect(lambda value, on: header.apply_filter(logical_index, value, on))
+        self.list_view = QListView()
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setModel(self.model)
+        layout.addWidget(self.list_view)
+
+        clear_button = QPushButton("Clear Filters")
+        clear_button.clicked.connect(lambda: (self.close(), header.clear_filters(logical_index)))
+        layout.addWidget(clear_button)
+        self.resize(max(header.sectionSize(logical_index), 420), 360)
+
+    def search_values(self, text):
+        text = text.strip().lower()
+        # 输入是上一次搜索的延续时只在上次结果中继续筛选
+        source = self.matched if self.search_text and self.search_text in text else self.all_values
+        values, lowered, counts = source
+        if text:
+            mask = pd.Series(lowered, dtype=object).str.contains(text, regex=False).to_numpy()
+            values, lowered, counts = values[mask], lowered[mask], counts[mask]
+        self.matched = (values, lowered, counts)
+        self.search_text = text
+        self.model.set_values(values, counts)
+
+
 class FilterHeader(QHeaderView):
-    def __init__(self, parent):
+    # column, ascending, append to the current sort
+    sortRequested = pyqtSignal(int, bool, bool)
+    sortCleared = pyqtSignal()
+
+    def __init__(self, parent, value_counts=None):
         super().__init__(Qt.Orientation.Horizontal, parent)
         self.setSectionsClickable(True)
         self.sectionClicked.connect(self.on_section_clicked)
         self.filters = {}
         self.parent = parent
+        # value_counts(column) -> (values, lowercased values, counts)
+        self.value_counts = value_counts
 
     def on_section_clicked(self, logical_index):
-        menu = QMenu(self)
-
-        # Get unique values for the column
-        column_data = []
-        for row in range(self.parent.rowCount()):
-            item = self.parent.item(row, logical_index)
-            if item:
-                column_data.append(item.text())
-        unique_values = sorted(set(column_data))
-
-        # Add filter options
-        for value in unique_values:
-            action = menu.addAction(value)
-            action.setCheckable(True)
-            if logical_index in self.filters and value in self.filters[logical_index]:
-                action.setChecked(True)
-            action.triggered.connect(lambda checked, v=value, col=logical_index:
-                                     self.apply_filter(col, v, checked))
-
-        # Add "Clear Filters" option
-        menu.addSeparator()
-        clear_action = menu.addAction("CLear Filters")
-        clear_action.triggered.connect(lambda: self.clear_filters(logical_index))
-
-        menu.exec(self.mapToGlobal(QPoint(0, self.height())))
+        if self.value_counts is not None:
+            values, lowered, counts = self.value_counts(logical_index)
+        else:
+            column_data = pd.Series([item.text() for row in range(self.parent.rowCount())
+                                     if (item := self.parent.item(row, logical_index))], dtype=object)
+            value_counts = column_data.value_counts().sort_index()
+            values = value_counts.index.to_numpy(dtype=object)
+            lowered = pd.Series(values, dtype=object).str.lower().to_numpy(dtype=object)
+            counts = value_counts.to_numpy()
+
+        popup = FilterPopup(self, logical_index, values, lowered, counts)
+        x = self.sectionViewportPosition(logical_index)
+        popup.move(self.mapToGlobal(QPoint(x, self.height())))
+        popup.show()
+        popup.search_input.setFocus()
 
     def apply_filter(self, column, value, checked):
         if column not in self.filters:
@@ -238,11 +586,129 @@ class FilterHeader(QHeaderView):
                     break
             self.parent.setRowHidden(row, not show_row)
 
-class StatisticsWindow(QMainWindow):
+def draw_gender_pie(ax, gender_counts, title="Gender Distribution Statistics"):
+    labels = gender_counts.index.tolist()
+    sizes = gender_counts.values.tolist()
+
+    def func(pct, allvals):
+        absolute = int(np.round(pct / 100. * np.sum(allvals)))
+        return f"{pct:.1f}%\n({absolute} people)"
+
+    patches, texts, autotexts = ax.pie(sizes,
+                                       labels=labels,
+                                       autopct=lambda pct: func(pct, sizes),
+                                       startangle=90,
+                                       colors=['#FF9999', '#66B2FF'])
+
+    plt.setp(autotexts, size=9, weight="bold")
+    plt.setp(texts, size=10)
+
+    ax.set_title(title, pad=20, size=12, weight="bold")
+
+
+def draw_count_bar(ax, counts, title, xlabel):
+    # 与 StatisticsWindow 中 pyqtgraph 柱状图一致的静态版本，用于离屏报表
+    labels = [str(label) for label in counts.index]
+    values = counts.values.tolist()
+    bars = ax.bar(range(len(labels)), values, width=0.6, color='#00ACC1')
+    ax.bar_label(bars, labels=[str(v) for v in values], size=8)
+    ax.set_xticks(range(len(labels)))
+    ax.set_xticklabels(labels, rotation=30, ha="right", size=8)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("Population")
+    ax.set_ylim(0, (max(values) if values else 1) * 1.2)
+    ax.set_title(title, size=12, weight="bold")
+
+
+class StatisticsCube:
+    """
+    Gender × Ethnicity × Department × Major × Province 的人数立方体。
+    一次 groupby 建立，增删改时只调整受影响单元格的计数；
+    任意维度的汇总、切片、下钻都只读取单元格，不再扫描原始数据。
+    """
+    DIMENSIONS = ["Gender", "Ethnicity", "Department", "Major", "Province"]
+
     def __init__(self, df):
+        self.rebuild(df)
+
+    @classmethod
+    def record_key(cls, record):
+        return tuple("No Data" if pd.isna(record.get(column)) else str(record.get(column))
+                      for column in cls.DIMENSIONS)
+
+    def rebuild(self, df):
+        self.cells = []        # cell id -> (gender, ethnicity, department, major, province)
+        self.cell_ids = {}     # cell key -> cell id
+        self.counts = []       # cell id -> number of students
+        self.row_cells = pd.Series(dtype="int64")  # row label -> cell id
+        self._frame = None
+        if df.empty:
+            return
+
+        keys = df[self.DIMENSIONS].fillna("No Data").astype(str)
+        grouped = keys.groupby(self.DIMENSIONS, sort=False)
+        codes = grouped.ngroup().to_numpy()
+        _, first_rows = np.unique(codes, return_index=True)
+        self.cells = list(keys.iloc[first_rows].itertuples(index=False, name=None))
+        self.cell_ids = {cell: cell_id for cell_id, cell in enumerate(self.cells)}
+        self.counts = np.bincount(codes, minlength=len(self.cells)).tolist()
+        self.row_cells = pd.Series(codes.astype(np.int64), index=df.index)
+
+    def update_rows(self, df, labels):
+        for label in labels:
+            if label in self.row_cells.index:
+                self.counts[self.row_cells.loc[label]] -= 1
+                if label not in df.index:
+                    self.row_cells = self.row_cells.drop(label)
+            if label in df.index:
+                key = self.record_key(df.loc[label])
+                cell_id = self.cell_ids.get(key)
+                if cell_id is None:
+                    cell_id = self.cell_ids[key] = len(self.cells)
+                    self.cells.append(key)
+                    self.counts.append(0)
+                self.counts[cell_id] += 1
+                self.row_cells.loc[label] = cell_id
+        self._frame = None
+
+    def clear_cache(self):
+        self._frame = None
+
+    def frame(self):
+        # 单元格表在下次修改前一直复用
+        if self._frame is None:
+            frame = pd.DataFrame(self.cells, columns=self.DIMENSIONS)
+            frame["Count"] = np.asarray(self.counts, dtype=np.int64)
+            self._frame = frame[frame["Count"] > 0]
+        return self._frame
+
+    def rollup(self, dimensions, **filters):
+        """按 dimensions 汇总人数，filters 为切片条件，如 rollup(["Major", "Gender"], Department="...")"""
+        frame = self.frame()
+        for column, value in filters.items():
+            frame = frame[frame[column] == value]
+        counts = frame.groupby(list(dimensions))["Count"].sum()
+        return counts[counts > 0].sort_values(ascending=False, kind="stable")
+
+    def total(self, **filters):
+        frame = self.frame()
+        for column, value in filters.items():
+            frame = frame[frame[column] == value]
+        return int(frame["Count"].sum())
+
+
+class StatisticsWindow(QMainWindow):
+    # 点击柱形时按此顺序下钻到下一维度
+    DRILL_ORDER = ["Department", "Major", "Province", "Ethnicity"]
+    GENDER_COLORS = ['#FF9999', '#66B2FF', '#C0C0C0']
+
+    def __init__(self, cube):
         super().__init__()
         self.setWindowTitle("Data Statistics")
         self.setGeometry(100, 100, 800, 600)
+        self.cube = cube
+        self.drill_filters = []  # [(dimension, value), ...]
+        self.bar_labels = []
 
         # Create central widget
         central_widget = QWidget()
@@ -256,60 +722,121 @@ class StatisticsWindow(QMainWindow):
 
         # Create pyqtgraph widget for bar chart
         self.plot_widget = pg.PlotWidget()
+        self.plot_widget.scene().sigMouseClicked.connect(self.on_plot_clicked)
+        self.legend = self.plot_widget.addLegend()
         layout.addWidget(self.plot_widget)
 
+        # Drill-down path and dimension selector for the bar chart
+        drill_layout = QHBoxLayout()
+        self.drill_label = QLabel()
+        self.back_button = QPushButton("Back")
+        self.back_button.clicked.connect(self.drill_up)
+        self.dimension_box = QComboBox()
+        self.dimension_box.addItems(self.DRILL_ORDER + ["Gender"])
+        self.dimension_box.currentTextChanged.connect(self.change_dimension)
+        drill_layout.addWidget(self.drill_label, 1)
+        drill_layout.addWidget(QLabel("Group by:"))
+        drill_layout.addWidget(self.dimension_box)
+        drill_layout.addWidget(self.back_button)
+        layout.addLayout(drill_layout)
+
         # Buttons to switch charts
         button_layout = QHBoxLayout()
         self.pie_button = QPushButton("Gender Distribution Pie Chart")
         self.bar_button = QPushButton("Department Population Bar Chart")
-        self.pie_button.clicked.connect(lambda: self.plot_pie_chart(df))
-        self.bar_button.clicked.connect(lambda: self.plot_bar_chart(df))
+        self.pie_button.clicked.connect(self.plot_pie_chart)
+        self.bar_button.clicked.connect(lambda: self.change_dimension("Department"))
         button_layout.addWidget(self.pie_button)
         button_layout.addWidget(self.bar_button)
         layout.addLayout(button_layout)
 
         # Default to pie chart
-        self.plot_pie_chart(df)
+        self.plot_pie_chart()
+
+    def set_bar_controls_visible(self, visible):
+        for widget in (self.drill_label, self.back_button, self.dimension_box):
+            widget.setVisible(visible)
 
-    def plot_pie_chart(self, df):
+    def plot_pie_chart(self):
         self.plot_widget.hide()
+        self.set_bar_controls_visible(False)
         self.canvas.show()
 
-        gender_counts = df["Gender"].value_counts()
-        labels = gender_counts.index.tolist()
-        sizes = gender_counts.values.tolist()
-
         self.figure.clear()
         ax = self.figure.add_subplot(111)
+        draw_gender_pie(ax, self.cube.rollup(["Gender"]))
+        self.canvas.draw()
 
-        def func(pct, allvals):
-            absolute = int(np.round(pct / 100. * np.sum(allvals)))
-            return f"{pct:.1f}%\n({absolute} people)"
-
-        patches, texts, autotexts = ax.pie(sizes,
-                                           labels=labels,
-                                           autopct=lambda pct: func(pct, sizes),
-                                           startangle=90,
-                                           colors=['#FF9999', '#66B2FF'])
+    def change_dimension(self, dimension):
+        self.drill_filters = []
+        self.bar_dimension = dimension
+        if self.dimension_box.currentText() != dimension:
+            self.dimension_box.blockSignals(True)
+            self.dimension_box.setCurrentText(dimension)
+            self.dimension_box.blockSignals(False)
+        self.plot_bar_chart()
+
+    def drill_down(self, value):
+        self.drill_filters.append((self.bar_dimension, value))
+        filtered = {dimension for dimension, _ in self.drill_filters}
+        remaining = [dimension for dimension in self.DRILL_ORDER if dimension not in filtered]
+        if not remaining:
+            self.drill_filters.pop()
+            return
+        self.bar_dimension = remaining[0]
+        self.plot_bar_chart()
 
-        plt.setp(autotexts, size=9, weight="bold")
-        plt.setp(texts, size=10)
+    def drill_up(self):
+        if not self.drill_filters:
+            return
+        self.bar_dimension, _ = self.drill_filters.pop()
+        self.plot_bar_chart()
 
-        ax.set_title("Gender Distribution Statistics", pad=20, size=12, weight="bold")
-        self.canvas.draw()
+    def on_plot_clicked(self, event):
+        if not self.plot_widget.isVisible() or not self.bar_labels or self.bar_dimension == "Gender":
+            return
+        point = self.plot_widget.plotItem.vb.mapSceneToView(event.scenePos())
+        index = int(round(point.x()))
+        if 0 <= index < len(self.bar_labels):
+            self.drill_down(self.bar_labels[index])
 
-    def plot_bar_chart(self, df):
+    def plot_bar_chart(self):
         self.canvas.hide()
         self.plot_widget.show()
+        self.set_bar_controls_visible(True)
 
         self.plot_widget.clear()
-        dept_counts = df["Department"].value_counts()
-        labels = dept_counts.index.tolist()
-        values = dept_counts.values.tolist()
-
-        x = range(len(labels))
-        bar = pg.BarGraphItem(x=x, height=values, width=0.6, brush='#00ACC1')
-        self.plot_widget.addItem(bar)
+        self.legend.clear()
+        dimension = self.bar_dimension
+        filters = dict(self.drill_filters)
+        path = " > ".join(value for _, value in self.drill_filters)
+        self.drill_label.setText(f"All students > {path}" if path else
+                                 "All students (click a bar to drill down)")
+        self.back_button.setEnabled(bool(self.drill_filters))
+
+        totals = self.cube.rollup([dimension], **filters)
+        labels = totals.index.tolist()
+        self.bar_labels = labels
+        if not labels:
+            return
+        values = totals.values.tolist()
+
+        if filters and dimension != "Gender":
+            # 下钻后按性别拆分
+            by_gender = self.cube.rollup([dimension, "Gender"], **filters)
+            genders = sorted(by_gender.index.get_level_values("Gender").unique())
+            width = 0.8 / len(genders)
+            for i, gender in enumerate(genders):
+                heights = [int(by_gender.get((label, gender), 0)) for label in labels]
+                x = [j - 0.4 + width * (i + 0.5) for j in range(len(labels))]
+                bar = pg.BarGraphItem(x=x, height=heights, width=width,
+                                      brush=self.GENDER_COLORS[i % len(self.GENDER_COLORS)])
+                self.plot_widget.addItem(bar)
+                self.legend.addItem(bar, gender)
+        else:
+            x = range(len(labels))
+            bar = pg.BarGraphItem(x=x, height=values, width=0.6, brush='#00ACC1')
+            self.plot_widget.addItem(bar)
 
         # Add value labels
         for i, v in enumerate(values):
@@ -319,13 +846,132 @@ class StatisticsWindow(QMainWindow):
 
         # Set axis labels
         self.plot_widget.getAxis('bottom').setTicks([[(i, label) for i, label in enumerate(labels)]])
-        self.plot_widget.setTitle("Department Population Distribution")
+        self.plot_widget.setTitle(f"{dimension} Population Distribution")
         self.plot_widget.setLabel('left', 'Population')
 
         # Adjust display range
         self.plot_widget.setRange(xRange=[-0.5, len(labels) - 0.5],
                                   yRange=[0, max(values) * 1.2])
 
+DEEP_SIZE_SAMPLE = 1000
+
+
+def deep_size(obj, seen=None):
+    """
+    近似计算对象占用的字节数，递归统计容器内容，共享对象只计一次。
+    大容器只测量前 DEEP_SIZE_SAMPLE 个元素再按比例推算，保证大数据量下也能快速统计。
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        size = obj.nbytes
+        if obj.dtype == object and obj.size:
+            values = obj.ravel()
+            sample = values[:DEEP_SIZE_SAMPLE]
+            size += sum(deep_size(value, seen) for value in sample) * len(values) // len(sample)
+        return size
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict) and obj:
+        sample = islice(obj.items(), DEEP_SIZE_SAMPLE)
+        measured = sum(deep_size(key, seen) + deep_size(value, seen) for key, value in sample)
+        size += measured * len(obj) // min(len(obj), DEEP_SIZE_SAMPLE)
+    elif isinstance(obj, (list, tuple, set, frozenset)) and obj:
+        measured = sum(deep_size(value, seen) for value in islice(obj, DEEP_SIZE_SAMPLE))
+        size += measured * len(obj) // min(len(obj), DEEP_SIZE_SAMPLE)
+    return size
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def format_memory_report(report, budget=None):
+    lines = [f"{'Category':<10} {'Component':<36} {'Size':>10}"]
+    for category, component, size in report:
+        lines.append(f"{category:<10} {component:<36} {format_bytes(size):>10}")
+    total = sum(size for _, _, size in report)
+    lines.append(f"{'Total':<47} {format_bytes(total):>10}")
+    if budget:
+        lines.append(f"{'Budget':<47} {format_bytes(budget):>10}")
+    return "\n".join(lines)
+
+
+class DiagnosticsWindow(QMainWindow):
+    """内存诊断面板：每个组件的占用字节数，定时刷新"""
+
+    def __init__(self, main_window):
+        super().__init__()
+        self.setWindowTitle("Memory Diagnostics")
+        self.setGeometry(150, 150, 560, 500)
+        self.main_window = main_window
+
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        layout = QVBoxLayout(central_widget)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(3)
+        self.table.setHorizontalHeaderLabels(["Category", "Component", "Size"])
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        layout.addWidget(self.table)
+
+        self.total_label = QLabel()
+        layout.addWidget(self.total_label)
+
+        button_layout = QHBoxLayout()
+        self.evict_button = QPushButton("Clear Caches")
+        self.evict_button.clicked.connect(self.clear_caches)
+        button_layout.addWidget(self.evict_button)
+        layout.addLayout(button_layout)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(3000)
+        self.timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer.stop()
+
+    def clear_caches(self):
+        self.main_window.evict_caches()
+        self.refresh()
+
+    def refresh(self):
+        report = self.main_window.memory_report()
+        self.table.setRowCount(len(report))
+        for row, (category, component, size) in enumerate(report):
+            self.table.setItem(row, 0, QTableWidgetItem(category))
+            self.table.setItem(row, 1, QTableWidgetItem(component))
+            item = QTableWidgetItem(format_bytes(size))
+            item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.table.setItem(row, 2, item)
+
+        total = sum(size for _, _, size in report)
+        budget = self.main_window.memory_budget
+        text = f"Total: {format_bytes(total)}"
+        if budget:
+            text += f"    Budget: {format_bytes(budget)}"
+        self.total_label.setText(text)
+
+
 def is_chinese(text):
     if not text:
         return False
@@ -365,8 +1011,952 @@ def validate_province(province):
     return True, ""
 
 
-class MainWindow(QMainWindow):
+def within_one_edit(a, b):
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+class DuplicateIndex:
+    """按 Department+Province+Gender 分块，在块内按姓名查找重复和近似重复的学生"""
+    BLOCK_COLUMNS = ["Department", "Province", "Gender"]
+    # Two-character names differing by one character are usually different people
+    MIN_NEAR_LENGTH = 3
+    VARIANT_HASH_BASE = 1000003
+
+    def __init__(self, df):
+        self.rebuild(df)
+
+    @classmethod
+    def record_key(cls, record):
+        values = []
+        for column in cls.BLOCK_COLUMNS + ["Name"]:
+            value = record.get(column)
+            values.append("No Data" if pd.isna(value) else str(value).strip())
+        return tuple(values)
+
+    @classmethod
+    def name_variants(cls, name):
+        # The name itself plus every single-character deletion; two names
+        # sharing a variant are at most one edit apart
+        if len(name) < cls.MIN_NEAR_LENGTH:
+            return set()
+        return {name} | {name[:i] + name[i + 1:] for i in range(len(name))}
+
+    def rebuild(self, df):
+        self.keys = []         # group id -> (department, province, gender, name)
+        self.key_ids = {}      # (department, province, gender, name) -> group id
+        self.sizes = []        # group id -> number of rows
+        self.block_ids = {}    # (department, province, gender) -> block id
+        # Name variants are looked up by a hash of (block id, variant): the
+        # group ids sharing hash variant_hashes[i] are
+        # variant_gids[variant_offsets[i]:variant_offsets[i + 1]]. A hash
+        # collision only adds a candidate, and every candidate is confirmed
+        # with within_one_edit
+        self.variant_hashes = np.zeros(0, dtype=np.uint64)
+        self.variant_offsets = np.zeros(1, dtype=np.int64)
+        self.variant_gids = np.zeros(0, dtype=np.int64)
+        self.extra_variants = {}  # variant hash -> ids of groups added after the rebuild
+        self.row_ids = pd.Series(dtype="int64")  # row label -> group id
+
+        if df.empty:
+            return
+
+        # Factorize each column on its distinct values only, then combine the
+        # per-column codes into one integer key per row
+        combined = np.zeros(len(df), dtype=np.int64)
+        column_values = []
+        for column in self.BLOCK_COLUMNS + ["Name"]:
+            if column == "Name":
+                block_combined = combined
+            codes, uniques = pd.factorize(df[column].fillna("No Data"))
+            stripped = [str(value).strip() for value in uniques.tolist()]
+            merged_codes, merged_uniques = pd.factorize(pd.Index(stripped, dtype=object))
+            combined = combined * len(merged_uniques) + merged_codes[codes]
+            column_values.append((merged_codes[codes], merged_uniques))
+
+        codes, _ = pd.factorize(combined)
+        self.row_ids = pd.Series(codes.astype(np.int64), index=df.index)
+        _, first_rows = np.unique(codes, return_index=True)
+        self.keys = list(zip(*(uniques[value_codes[first_rows]].tolist()
+                               for value_codes, uniques in column_values)))
+        self.key_ids = {key: gid for gid, key in enumerate(self.keys)}
+        self.sizes = np.bincount(codes, minlength=len(self.keys)).tolist()
+        block_codes, _ = pd.factorize(block_combined[first_rows])
+        _, first_groups = np.unique(block_codes, return_index=True)
+        self.block_ids = {self.keys[gid][:-1]: int(block_codes[gid]) for gid in first_groups}
+        self._index_all_variants(block_codes)
+
+    @classmethod
+    def variant_hash(cls, block_id, variant):
+        value = block_id + 1
+        for char in variant:
+            value = (value * cls.VARIANT_HASH_BASE + ord(char)) % 2 ** 64
+        return value
+
+    def _index_all_variants(self, block_codes):
+        # Same variants as name_variants, generated for all groups at once: the
+        # names become rows of a character matrix and each deletion drops one column
+        names = np.array([key[-1] for key in self.keys], dtype=str)
+        lengths = np.char.str_len(names)
+        gids = np.flatnonzero(lengths >= self.MIN_NEAR_LENGTH)
+        if not len(gids):
+            return
+        names, lengths = names[gids], lengths[gids]
+        width = names.dtype.itemsize // 4
+        chars = names.view(np.uint32).reshape(len(names), width).astype(np.uint64)
+        seeds = block_codes[gids].astype(np.uint64) + np.uint64(1)
+        hashes, owners = [self._hash_rows(seeds, chars)], [gids]
+        for i in range(width):
+            keep = lengths > i
+            deleted = np.concatenate([chars[keep, :i], chars[keep, i + 1:]], axis=1)
+            hashes.append(self._hash_rows(seeds[keep], deleted))
+            owners.append(gids[keep])
+        hashes, owners = np.concatenate(hashes), np.concatenate(owners)
+
+        # Sort by hash, then drop the repeats that a name with a doubled
+        # character produces (张张三 -> 张三 twice)
+        order = np.lexsort((owners, hashes))
+        hashes, owners = hashes[order], owners[order]
+        keep = np.ones(len(hashes), dtype=bool)
+        keep[1:] = (hashes[1:] != hashes[:-1]) | (owners[1:] != owners[:-1])
+        hashes, owners = hashes[keep], owners[keep]
+        starts = np.flatnonzero(np.r_[True, hashes[1:] != hashes[:-1]])
+        self.variant_hashes = hashes[starts]
+        self.variant_offsets = np.append(starts, len(hashes))
+        self.variant_gids = owners
+
+    @classmethod
+    def _hash_rows(cls, seeds, chars):
+        # variant_hash for every row; names are padded with trailing zeros,
+        # which are skipped, and uint64 arithmetic wraps like % 2 ** 64
+        values = seeds.copy()
+        for column in chars.T:
+            values = np.where(column > 0, values * cls.VARIANT_HASH_BASE + column, values)
+        return values
+
+    def _hash_groups(self, value):
+        # 变体哈希相同的分组 id（可能含哈希冲突，调用方需再核对）
+        groups = list(self.extra_variants.get(value, ()))
+        i = np.searchsorted(self.variant_hashes, np.uint64(value))
+        if i < len(self.variant_hashes) and self.variant_hashes[i] == value:
+            groups += self.variant_gids[self.variant_offsets[i]:self.variant_offsets[i + 1]].tolist()
+        return groups
+
+    def _variant_groups(self, block_id, variants):
+        groups = []
+        for value in {self.variant_hash(block_id, variant) for variant in variants}:
+            groups += self._hash_groups(value)
+        return groups
+
+    def _group_id(self, key):
+        gid = self.key_ids.get(key)
+        if gid is None:
+            gid = len(self.keys)
+            self.keys.append(key)
+            self.key_ids[key] = gid
+            self.sizes.append(0)
+            block_id = self.block_ids.setdefault(key[:-1], len(self.block_ids))
+            for variant in self.name_variants(key[-1]):
+                self.extra_variants.setdefault(self.variant_hash(block_id, variant), []).append(gid)
+        return gid
+
+    def add(self, label, record):
+        gid = self._group_id(self.record_key(record))
+        self.sizes[gid] += 1
+        self.row_ids.loc[label] = gid
+
+    def remove(self, label):
+        if label not in self.row_ids.index:
+            return
+        self.sizes[self.row_ids.loc[label]] -= 1
+        self.row_ids = self.row_ids.drop(label)
+
+    def update(self, label, record):
+        if label in self.row_ids.index:
+            self.sizes[self.row_ids.loc[label]] -= 1
+        self.add(label, record)
+
+    def _near_groups(self, key, exclude=None):
+        block_id, name = self.block_ids.get(key[:-1]), key[-1]
+        found = set()
+        if block_id is None:
+            return found
+        for other in self._variant_groups(block_id, self.name_variants(name)):
+            if other != exclude and self.sizes[other] > 0 and within_one_edit(name, self.keys[other][-1]):
+                found.add(other)
+        return found
+
+    def check(self, record):
+        """返回 [(姓名, 人数, 是否完全重复)]，用于添加记录前的重复提示"""
+        key = self.record_key(record)
+        matches = []
+        gid = self.key_ids.get(key)
+        if gid is not None and self.sizes[gid] > 0:
+            matches.append((key[-1], self.sizes[gid], True))
+        for other in sorted(self._near_groups(key, exclude=gid)):
+            matches.append((self.keys[other][-1], self.sizes[other], False))
+        return matches
+
+    def find_duplicates(self):
+        """返回 (完全重复的分组, 近似重复的分组对)"""
+        exact = [gid for gid, size in enumerate(self.sizes) if size > 1]
+        near = set()
+        # Only buckets shared by two or more groups can hold a pair
+        offsets = self.variant_offsets
+        buckets = [self.variant_gids[offsets[i]:offsets[i + 1]].tolist()
+                   for i in np.flatnonzero(np.diff(offsets) > 1)]
+        buckets += [self._hash_groups(value) for value in self.extra_variants]
+        for gids in buckets:
+            for i, a in enumerate(gids):
+                if self.sizes[a] == 0:
+                    continue
+                for b in gids[i + 1:]:
+                    if self.sizes[b] > 0 and within_one_edit(self.keys[a][-1], self.keys[b][-1]):
+                        near.add((min(a, b), max(a, b)))
+        return exact, sorted(near)
+
+    def rows_in_groups(self, gids):
+        return self.row_ids.index[self.row_ids.isin(list(gids)).to_numpy()]
+
+    def update_rows(self, df, labels):
+        for label in labels:
+            if label in df.index:
+                self.update(label, df.loc[label])
+            else:
+                self.remove(label)
+
+
+CHAR_PINYIN = {}  # 汉字 -> 拼音，按字缓存
+
+
+def char_pinyin(char):
+    syllable = CHAR_PINYIN.get(char)
+    if syllable is None:
+        syllable = ""
+        if lazy_pinyin is not None and "一" <= char <= "鿿":
+            syllable = re.sub(r"[^a-z0-9]", "", lazy_pinyin(char)[0].lower())
+        CHAR_PINYIN[char] = syllable
+    return syllable
+
+
+def collation_keys(texts):
+    """
+    中文按拼音排序，拼音相同时再按原文排序。
+    排序键是字符串：各音节（或单词）以 \\x01 连接，再以 \\x00 接上原文；
+    分隔符小于任何可见字符，所以按字符串比较和逐个音节比较的顺序相同。
+    """
+    if lazy_pinyin is None:
+        return ["\x01".join(text.lower().split()) + "\x00" + text for text in texts]
+    # Each Chinese character becomes its syllable between spaces, so one
+    # str.translate per value replaces a lazy_pinyin call
+    table = {ord(char): f" {char_pinyin(char)} " for char in set("".join(texts)) if "一" <= char <= "鿿"}
+    return ["\x01".join(text.lower().translate(table).split()) + "\x00" + text for text in texts]
+
+
+class SortKeyIndex:
+    """每列的排序键（中文按拼音）在第一次按该列排序时计算，排序时对整数排名做向量化 argsort"""
+    MAX_CACHED_PERMUTATIONS = 16
+
+    def __init__(self, df):
+        self.collation_keys = {}  # value -> collation key, shared by all columns
+        self.rebuild(df)
+
+    def rebuild(self, df):
+        self.ranks = {}        # column -> Series of int ranks aligned with df.index
+        self.value_ranks = {}  # column -> {value: rank}
+        self.permutations = {}
+
+    def _compute_ranks(self, df, column):
+        codes, uniques = pd.factorize(df[column])
+        uniques = uniques.tolist()
+        cache = self.collation_keys
+        missing = [value for value in uniques if value not in cache]
+        cache.update(zip(missing, collation_keys([str(value) for value in missing])))
+        keys = [cache[value] for value in uniques]
+        order = sorted(range(len(uniques)), key=keys.__getitem__)
+        unique_ranks = np.empty(len(uniques) + 1, dtype=np.int64)
+        unique_ranks[order] = np.arange(len(uniques))
+        unique_ranks[-1] = len(uniques)  # 空值 (code -1) 排在最后
+        self.ranks[column] = pd.Series(unique_ranks[codes], index=df.index)
+        self.value_ranks[column] = dict(zip(uniques, unique_ranks[:-1].tolist()))
+
+    def update_rows(self, df, labels):
+        """只更新修改过的行；出现新值的列下次排序时重新计算排名"""
+        self.permutations.clear()
+        for column in list(self.ranks):
+            if column not in df.columns:
+                self.ranks.pop(column)
+                continue
+            ranks = self.ranks[column]
+            value_ranks = self.value_ranks[column]
+            for label in labels:
+                if label not in df.index:
+                    if label in ranks.index:
+                        ranks = ranks.drop(label)
+                    continue
+                value = df.at[label, column]
+                rank = len(value_ranks) if pd.isna(value) else value_ranks.get(value)
+                if rank is None:
+                    ranks = None
+                    break
+                ranks.loc[label] = rank
+            if ranks is None:
+                self.ranks.pop(column)
+            else:
+                self.ranks[column] = ranks
+
+    def sort(self, df, spec):
+        """spec 为 ((列名, 是否升序), ...)，返回排序后的行索引"""
+        spec = tuple(spec)
+        if spec in self.permutations:
+            return self.permutations[spec]
+
+        keys = []
+        for column, ascending in reversed(spec):
+            ranks = self.ranks.get(column)
+            if ranks is None or not ranks.index.equals(df.index):
+                self._compute_ranks(df, column)
+                ranks = self.ranks[column]
+            values = ranks.to_numpy()
+            keys.append(values if ascending else -values)
+        labels = df.index.to_numpy()[np.lexsort(keys)] if keys else df.index.to_numpy()
+
+        if len(self.permutations) >= self.MAX_CACHED_PERMUTATIONS:
+            self.permutations.pop(next(iter(self.permutations)))
+        self.permutations[spec] = labels
+        return labels
+
+
+def pinyin_keys(values):
+    """
+    各取值的拼音音节（以空格分隔），如 张元彬 -> "zhang yuan bin"；
+    其余文字按单词切分，只保留小写字母和数字。
+    """
+    texts = [str(value).lower() for value in values]
+    # Every non-alphanumeric character becomes its syllable surrounded by
+    # separators, so one str.translate converts a whole value at C speed
+    table = {ord(char): f" {char_pinyin(char)} " for char in set("".join(texts))
+             if not ("a" <= char <= "z" or "0" <= char <= "9")}
+    return [" ".join(text.translate(table).split()) for text in texts]
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein 距离；超过 limit 时提前返回 limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class PinyinIndex:
+    """Name/Major 各取值的拼音键（音节、全拼、首字母）和全拼 n-gram 索引，用于按读音搜索和容错搜索"""
+    COLUMNS = ["Name", "Major"]
+    GRAM = 2
+    MAX_FUZZY_CANDIDATES = 5000
+
+    def __init__(self, df):
+        self.rebuild(df)
+
+    def rebuild(self, df):
+        self.values = {}     # column -> distinct values
+        self.value_ids = {}  # column -> {value: value id}
+        self.keys = {}       # column -> space separated syllables, e.g. "zhang yuan bin"
+        self.full = {}       # column -> full pinyin, e.g. "zhangyuanbin"
+        self.initials = {}   # column -> initials, e.g. "zyb"
+        self.grams = {}      # column -> {n-gram of the full pinyin: array of value ids}
+        self.row_ids = {}    # column -> Series of value ids aligned with df.index, -1 when missing
+        self.key_text = {}   # (column, field) -> (newline separated values, value start offsets), built on demand
+        for column in self.COLUMNS:
+            if column not in df.columns:
+                continue
+            # Keys are computed once per distinct value, in factorize order
+            codes, uniques = pd.factorize(df[column])
+            keys = pinyin_keys(uniques)
+            self.values[column] = uniques.tolist()
+            self.value_ids[column] = {value: value_id for value_id, value in enumerate(self.values[column])}
+            self.keys[column] = keys
+            self.full[column] = [key.replace(" ", "") for key in keys]
+            self.initials[column] = ["".join(syllable[0] for syllable in key.split()) for key in keys]
+            self.grams[column] = self._gram_postings(self.full[column])
+            self.row_ids[column] = pd.Series(codes.astype(np.int64), index=df.index)
+
+    def _gram_postings(self, full):
+        # Full pinyin is ASCII, so the values form a zero padded byte matrix and
+        # every n-gram is one integer code; (code, value id) pairs are then
+        # deduplicated and split into one id array per n-gram
+        width = max(map(len, full), default=0)
+        if width < self.GRAM:
+            return {}
+        chars = np.array(full, dtype=f"S{width}").view(np.uint8).reshape(len(full), width).astype(np.int64)
+        codes = np.zeros((len(full), width - self.GRAM + 1), dtype=np.int64)
+        for offset in range(self.GRAM):
+            codes = codes * 256 + chars[:, offset:width - self.GRAM + 1 + offset]
+        valid = chars[:, self.GRAM - 1:] > 0
+        rows = np.broadcast_to(np.arange(len(full))[:, None], codes.shape)
+        pairs = np.sort(codes[valid] * len(full) + rows[valid])
+        pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]]
+        codes, ids = np.divmod(pairs, len(full))
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        return {int(code).to_bytes(self.GRAM, "big").decode(): group
+                for code, group in zip(codes[starts].tolist(), np.split(ids, starts[1:]))}
+
+    def _value_id(self, column, value):
+        value_id = self.value_ids[column].get(value)
+        if value_id is None:
+            value_id = self.value_ids[column][value] = len(self.values[column])
+            for field in ("keys", "full", "initials"):
+                self.key_text.pop((column, field), None)
+            key = pinyin_keys([value])[0]
+            full = key.replace(" ", "")
+            self.values[column].append(value)
+            self.keys[column].append(key)
+            self.full[column].append(full)
+            self.initials[column].append("".join(syllable[0] for syllable in key.split()))
+            grams = self.grams[column]
+            for gram in {full[i:i + self.GRAM] for i in range(len(full) - self.GRAM + 1)}:
+                grams[gram] = np.append(grams.get(gram, np.empty(0, dtype=np.int64)), value_id)
+        return value_id
+
+    def update_rows(self, df, labels):
+        for column, row_ids in self.row_ids.items():
+            for label in labels:
+                if label not in df.index:
+                    if label in row_ids.index:
+                        row_ids = row_ids.drop(label)
+                    continue
+                value = df.at[label, column]
+                row_ids.loc[label] = -1 if pd.isna(value) else self._value_id(column, value)
+            self.row_ids[column] = row_ids
+
+    @staticmethod
+    def normalize(query):
+        return re.sub(r"[^a-z0-9]", "", query.lower())
+
+    def _row_values(self, df, column, value_result, missing):
+        # 取值级的结果经 value id 映射到 df 的各行，缺失值取 missing
+        row_ids = self.row_ids[column].reindex(df.index, fill_value=-1).to_numpy()
+        return np.append(value_result, missing)[row_ids]
+
+    def match_scores(self, df, query):
+        """
+        按音节前缀匹配各行，返回每行的匹配程度（0 表示不匹配）：
+        3 = 查询就是整个取值的全拼或首字母，2 = 从第一个音节开始匹配，1 = 从中间的音节开始匹配。
+        zyb、zhangyb、zhangyuanbin 都匹配 张元彬（zhang yuan bin），yb 也匹配但排在后面。
+        """
+        letters = self.normalize(query)
+        scores = np.zeros(len(df), dtype=np.int64)
+        if not letters:
+            return scores
+        # Consecutive letters either continue the current syllable or skip the
+        # rest of it and continue at the start of the next syllable. The first
+        # letter leads the pattern so the regex engine can scan for it as a
+        # literal; the lookbehind then checks that it starts a syllable
+        first = letters[0]
+        rest = "".join(r"(?:[a-z0-9]* )?" + letter for letter in letters[1:])
+        syllables = re.compile(first + rf"(?<![a-z0-9]{first})" + rest)
+        # Values are joined as "\nvalue\nvalue\n": the same syllable pattern
+        # anchored after a newline matches from the first syllable (zhangyb,
+        # zhyb, zyb), and a whole match is a plain literal search
+        leading = re.compile("\n" + first + rest)
+        whole = re.compile(re.escape("\n" + letters + "\n"))
+        for column in self.row_ids:
+            value_scores = self._matching_values(column, "keys", syllables).astype(np.int64)
+            # Leading and whole matches are always syllable prefix matches too,
+            # so they only need to be looked for when the syllable scan found any
+            if value_scores.any():
+                value_scores[self._matching_values(column, "keys", leading)] = 2
+                for field in ("full", "initials"):
+                    value_scores[self._matching_values(column, field, whole)] = 3
+            scores = np.maximum(scores, self._row_values(df, column, value_scores, 0))
+        return scores
+
+    def _matching_values(self, column, field, pattern):
+        # 一次扫描所有取值，再把匹配位置换算成取值序号
+        text, starts = self._joined(column, field)
+        positions = np.fromiter((found.start() for found in pattern.finditer(text)), dtype=np.int64)
+        matched = np.zeros(len(starts), dtype=bool)
+        matched[np.searchsorted(starts, positions, side="right") - 1] = True
+        return matched
+
+    def _joined(self, column, field):
+        # field 为 keys、full 或 initials；starts 是每个取值前面换行符的位置
+        entry = self.key_text.get((column, field))
+        if entry is None:
+            values = getattr(self, field)[column]
+            starts = np.cumsum([0] + [len(value) + 1 for value in values[:-1]], dtype=np.int64)
+            text = "\n" + "\n".join(values) + "\n" if values else ""
+            entry = self.key_text[(column, field)] = (text, starts)
+        return entry
+
+    def max_distance(self, letters):
+        return 1 if len(letters) <= 6 else 2
+
+    def similar_values(self, column, letters, max_distance):
+        """返回 {value id: 相似度}，相似度按全拼的编辑距离计算"""
+        full = self.full[column]
+        grams = {letters[i:i + self.GRAM] for i in range(len(letters) - self.GRAM + 1)}
+        postings = [self.grams[column][gram] for gram in grams if gram in self.grams[column]]
+        if not postings:
+            return {}
+        shared = np.bincount(np.concatenate(postings), minlength=len(full))
+        # Each edit destroys at most GRAM of the query's n-grams
+        candidates = np.flatnonzero(shared >= max(len(grams) - max_distance * self.GRAM, 1))
+        if len(candidates) > self.MAX_FUZZY_CANDIDATES:
+            order = np.argsort(-shared[candidates], kind="stable")
+            candidates = candidates[order[:self.MAX_FUZZY_CANDIDATES]]
+        scores = {}
+        for value_id in candidates.tolist():
+            distance = edit_distance(letters, full[value_id], max_distance)
+            if distance <= max_distance:
+                scores[value_id] = 1 - distance / max(len(letters), len(full[value_id]))
+        return scores
+
+    def fuzzy_scores(self, df, query):
+        """容错匹配：返回按相似度从高到低排列的 Series（行标签 -> 相似度）"""
+        letters = self.normalize(query)
+        best = np.zeros(len(df))
+        if len(letters) < self.GRAM:
+            return pd.Series(dtype=float)
+        max_distance = self.max_distance(letters)
+        for column in self.row_ids:
+            scores = self.similar_values(column, letters, max_distance)
+            if not scores:
+                continue
+            value_scores = np.zeros(len(self.values[column]))
+            value_scores[list(scores)] = list(scores.values())
+            best = np.maximum(best, self._row_values(df, column, value_scores, 0.0))
+        found = np.flatnonzero(best > 0)
+        order = found[np.argsort(-best[found], kind="stable")]
+        return pd.Series(best[order], index=df.index[order])
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+QUERY_TOKEN = re.compile(r'\s*(?:(?P<string>"[^"]*"|\'[^\']*\')|(?P<op>!=|!~|=|~|\(|\)|,)|(?P<word>[^\s=~!(),"\']+))')
+QUERY_KEYWORDS = {"AND", "OR", "NOT", "IN"}
+
+
+def looks_like_query(text):
+    return bool(re.search(r"[=~]|\bIN\s*\(", text))
+
+
+class QueryParser:
+    """
+    解析查询语句，例如：Gender=Female AND Province IN (北京, 上海) AND Name~丽
+    运算符：=  !=  ~ (包含)  !~ (不包含)  IN (...)  NOT IN (...)，可用 AND / OR / NOT 和括号组合，
+    关键字须大写，这样值里的 and、in 等单词不会被当作关键字。
+    语法树节点都是元组，可直接作为缓存键。
+    """
+
+    def __init__(self, text, columns):
+        self.columns = {column.lower(): column for column in columns}
+        self.tokens = []
+        position = 0
+        text = text.strip()
+        while position < len(text):
+            match = QUERY_TOKEN.match(text, position)
+            if not match or match.end() == position:
+                raise QuerySyntaxError(f"Unexpected character at position {position + 1}: {text[position]}")
+            position = match.end()
+            if match.group("string") is not None:
+                self.tokens.append(("value", match.group("string")[1:-1]))
+            elif match.group("op") is not None:
+                self.tokens.append(("op", match.group("op")))
+            elif match.group("word") in QUERY_KEYWORDS:
+                self.tokens.append(("keyword", match.group("word").upper()))
+            else:
+                self.tokens.append(("value", match.group("word")))
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def accept(self, kind, value=None):
+        token_kind, token_value = self.peek()
+        if token_kind == kind and (value is None or token_value == value):
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, kind, value):
+        if not self.accept(kind, value):
+            found = self.peek()[1]
+            raise QuerySyntaxError(f"Expected '{value}' but found {repr(found) if found else 'end of query'}")
+
+    def parse(self):
+        node = self.parse_or()
+        if self.position < len(self.tokens):
+            raise QuerySyntaxError(f"Unexpected '{self.peek()[1]}'")
+        return node
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.accept("keyword", "OR"):
+            node = ("or", node, self.parse_and())
+        return node
+
+    def parse_and(self):
+        node = self.parse_not()
+        while self.accept("keyword", "AND"):
+            node = ("and", node, self.parse_not())
+        return node
+
+    def parse_not(self):
+        if self.accept("keyword", "NOT"):
+            return ("not", self.parse_not())
+        if self.accept("op", "("):
+            node = self.parse_or()
+            self.expect("op", ")")
+            return node
+        return self.parse_condition()
+
+    def parse_value(self):
+        # Unquoted values may span several words, e.g. Department = School of English
+        words = []
+        while self.peek()[0] == "value":
+            words.append(self.peek()[1])
+            self.position += 1
+        if not words:
+            found = self.peek()[1]
+            raise QuerySyntaxError(f"Expected a value but found {repr(found) if found else 'end of query'}")
+        return " ".join(words)
+
+    def parse_condition(self):
+        kind, field = self.peek()
+        if kind != "value":
+            raise QuerySyntaxError(f"Expected a column name but found {repr(field) if field else 'end of query'}")
+        self.position += 1
+        column = self.columns.get(field.lower())
+        if column is None:
+            raise QuerySyntaxError(f"Unknown column: {field}")
+
+        negated = self.accept("keyword", "NOT")
+        if self.accept("keyword", "IN"):
+            self.expect("op", "(")
+            values = [self.parse_value()]
+            while self.accept("op", ","):
+                values.append(self.parse_value())
+            self.expect("op", ")")
+            return ("in", column, tuple(sorted(set(values))), negated)
+        if negated:
+            raise QuerySyntaxError("NOT after a column name must be followed by IN")
+
+        kind, op = self.peek()
+        if kind != "op" or op not in ("=", "!=", "~", "!~"):
+            raise QuerySyntaxError(f"Expected an operator after {field}")
+        self.position += 1
+        return ("compare", column, op, self.parse_value())
+
+
+class QueryEngine:
+    """把查询语法树编译为向量化的布尔掩码；语法树和中间掩码按数据版本缓存"""
+    MAX_CACHED_PLANS = 128
+    MAX_CACHED_MASKS = 256
+
     def __init__(self):
+        self.plans = OrderedDict()    # (query text, columns) -> syntax tree
+        self.masks = OrderedDict()    # syntax tree node -> bool array
+        self.columns = {}             # column -> (codes, lowercased distinct values)
+        self.version = None
+
+    def clear(self):
+        self.plans.clear()
+        self.masks.clear()
+        self.columns.clear()
+
+    @staticmethod
+    def remember(cache, key, value, limit):
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > limit:
+            cache.popitem(last=False)
+
+    def plan(self, text, columns):
+        # 不能合并空白：引号内的空白是取值的一部分
+        key = (text.strip(), tuple(columns))
+        node = self.plans.get(key)
+        if node is None:
+            node = QueryParser(text, columns).parse()
+        self.remember(self.plans, key, node, self.MAX_CACHED_PLANS)
+        return node
+
+    def sync(self, version):
+        if version != self.version:
+            # 数据变化后掩码失效，语法树仍可复用
+            self.masks.clear()
+            self.columns.clear()
+            self.version = version
+
+    def evaluate(self, df, text, version):
+        self.sync(version)
+        return self.mask(df, self.plan(text, df.columns))
+
+    def contains(self, df, term, version):
+        """任一列（去空格、小写后）包含 term 的行，缺失值不参与匹配"""
+        self.sync(version)
+        mask = np.zeros(len(df), dtype=bool)
+        for column in df.columns:
+            codes, lowered = self.column_codes(df, column)
+            matched = lowered.str.contains(term, regex=False).to_numpy(dtype=bool)
+            mask |= np.append(matched, False)[codes]
+        return mask
+
+    def column_codes(self, df, column):
+        # Each column is factorized once per data version; conditions are then
+        # matched against the distinct values and mapped back through the codes
+        entry = self.columns.get(column)
+        if entry is None:
+            codes, uniques = pd.factorize(df[column])
+            lowered = pd.Series(uniques, dtype=object).astype(str).str.strip().str.lower()
+            entry = self.columns[column] = (codes, lowered)
+        return entry
+
+    def mask(self, df, node):
+        cached = self.masks.get(node)
+        if cached is not None:
+            self.masks.move_to_end(node)
+            return cached
+
+        kind = node[0]
+        if kind == "and":
+            result = self.mask(df, node[1]) & self.mask(df, node[2])
+        elif kind == "or":
+            result = self.mask(df, node[1]) | self.mask(df, node[2])
+        elif kind == "not":
+            result = ~self.mask(df, node[1])
+        else:
+            codes, lowered = self.column_codes(df, node[1])
+            if kind == "in":
+                values = [value.strip().lower() for value in node[2]]
+                matched = lowered.isin(values).to_numpy()
+                match_missing = "no data" in values
+                negated = node[3]
+            else:
+                value = node[3].strip().lower()
+                if node[2] in ("=", "!="):
+                    matched = (lowered == value).to_numpy()
+                else:
+                    matched = lowered.str.contains(value, regex=False).to_numpy()
+                match_missing = value == "no data"
+                negated = node[2].startswith("!")
+            # Missing values are shown as "No Data" and are addressed by that text
+            result = np.append(matched, match_missing)[codes]
+            if negated:
+                result = ~result
+
+        self.remember(self.masks, node, result, self.MAX_CACHED_MASKS)
+        return result
+
+
+class RosterFileReader:
+    """
+    按块读取 CSV 数据文件，不把整个文件读入内存。
+    打开时扫描一遍换行符得到总行数和每块的起始字节偏移（不支持字段内换行）。
+    """
+    SCAN_CHUNK = 16 * 1024 * 1024
+
+    def __init__(self, file_path, block_size=1000):
+        self.file_path = file_path
+        self.block_size = block_size
+        self.file = open(file_path, "rb")
+        header = self.file.readline()
+        self.columns = pd.read_csv(io.BytesIO(header), nrows=0, encoding="utf-8-sig").columns.tolist()
+        self.data_start = len(header)
+        self.block_offsets, self.total_rows = self.scan()
+
+    def scan(self):
+        offsets = [self.data_start]
+        newline_count = 0
+        position = self.data_start
+        last_byte = b"\n"
+        self.file.seek(self.data_start)
+        while True:
+            chunk = self.file.read(self.SCAN_CHUNK)
+            if not chunk:
+                break
+            newlines = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 10)
+            # Row k + 1 starts right after the k-th newline; keep every block_size-th start
+            row_numbers = newline_count + np.arange(1, len(newlines) + 1)
+            starts = newlines[row_numbers % self.block_size == 0] + position + 1
+            offsets.extend(starts.tolist())
+            newline_count += len(newlines)
+            position += len(chunk)
+            last_byte = chunk[-1:]
+
+        total_rows = newline_count + (0 if last_byte == b"\n" else 1)
+        if offsets[-1] >= position:
+            offsets.pop()  # 文件末尾的换行后面没有数据
+        return offsets, total_rows
+
+    def block_count(self):
+        return len(self.block_offsets)
+
+    def read_block(self, block):
+        start = self.block_offsets[block]
+        end = self.block_offsets[block + 1] if block + 1 < len(self.block_offsets) else None
+        self.file.seek(start)
+        data = self.file.read(end - start) if end is not None else self.file.read()
+        return pd.read_csv(io.BytesIO(data), header=None, names=self.columns, dtype=str, keep_default_na=True)
+
+    def close(self):
+        self.file.close()
+
+
+class LRUBlockCache:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.blocks = OrderedDict()
+
+    def get(self, key):
+        block = self.blocks.get(key)
+        if block is not None:
+            self.blocks.move_to_end(key)
+        return block
+
+    def put(self, key, block):
+        self.blocks[key] = block
+        self.blocks.move_to_end(key)
+        while len(self.blocks) > self.capacity:
+            self.blocks.popitem(last=False)
+
+    def clear(self):
+        self.blocks.clear()
+
+
+class PagedRosterModel(QAbstractTableModel):
+    """分页模式的表格模型：滚动时通过 fetchMore 按块从磁盘读取，内存中只保留最近使用的若干块"""
+
+    def __init__(self, reader, cache_blocks=64, parent=None):
+        super().__init__(parent)
+        self.reader = reader
+        self.cache = LRUBlockCache(cache_blocks)
+        self.loaded_rows = 0
+
+    def total_rows(self):
+        return self.reader.total_rows
+
+    def block(self, block):
+        rows = self.cache.get(block)
+        if rows is None:
+            rows = self.reader.read_block(block).to_numpy(dtype=object)
+            self.cache.put(block, rows)
+        return rows
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded_rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.reader.columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        block, offset = divmod(index.row(), self.reader.block_size)
+        rows = self.block(block)
+        if offset >= len(rows):
+            return None
+        value = rows[offset][index.column()]
+        return "No Data" if pd.isna(value) else str(value)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.reader.columns[section]
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded_rows < self.reader.total_rows
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.reader.block_size, self.reader.total_rows - self.loaded_rows)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded_rows, self.loaded_rows + count - 1)
+        self.loaded_rows += count
+        self.endInsertRows()
+
+
+class RosterLoader(QThread):
+    """
+    后台线程按块读取数据文件，每读完一块发出 chunkLoaded 以便立即显示；
+    全部读完后在线程内建立各索引，再通过 loaded 交给主窗口；读取失败时只发出 loadFailed。
+    """
+    FIRST_CHUNK_SIZE = 200
+    CHUNK_SIZE = 20000
+    chunkLoaded = pyqtSignal(object, int)  # chunk, progress in thousandths of the file
+    loadFailed = pyqtSignal(str)
+    loaded = pyqtSignal(object, object)    # DataFrame, (duplicate index, sort keys, pinyin index, cube)
+
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+
+    def read_chunks(self):
+        if self.file_path.lower().endswith((".xlsx", ".xls")):
+            # Excel 无法分块读取
+            yield read_roster(self.file_path), 1000
+            return
+        size = max(os.path.getsize(self.file_path), 1)
+        with open(self.file_path, "rb") as handle, pd.read_csv(handle, chunksize=self.CHUNK_SIZE) as reader:
+            # A small first chunk gets rows on screen quickly
+            rows = self.FIRST_CHUNK_SIZE
+            while True:
+                try:
+                    chunk = reader.get_chunk(rows)
+                except StopIteration:
+                    return
+                yield chunk, min(1000 * handle.tell() // size, 1000)
+                rows = self.CHUNK_SIZE
+
+    def run(self):
+        chunks = []
+        try:
+            for chunk, progress in self.read_chunks():
+                if self.isInterruptionRequested():
+                    return
+                chunks.append(chunk)
+                self.chunkLoaded.emit(chunk, progress)
+        except FileNotFoundError:
+            self.loadFailed.emit("Student data file not found！")
+            return
+        except Exception as e:
+            self.loadFailed.emit(f"Failed to load student data: {str(e)}")
+            return
+        if self.isInterruptionRequested():
+            return
+        df = pd.concat(chunks) if chunks else pd.DataFrame()
+        self.loaded.emit(df, (DuplicateIndex(df), SortKeyIndex(df), PinyinIndex(df), StatisticsCube(df)))
+
+
+class MainWindow(QMainWindow):
+    # QTableWidgetItem 的 C++ 对象、数据向量和 QString 头部的估算开销
+    TABLE_ITEM_BYTES = 120
+    # 逐行修改累计超过 1/DATA_MEMORY_DRIFT 的行后重新测量数据列
+    DATA_MEMORY_DRIFT = 100
+
+    def __init__(self, file_path=DATA_FILE, paged=False, memory_budget=None, background=True):
         super().__init__()
         self.setWindowTitle("Student Basic Information Management")
         self.setGeometry(100, 100, 1000, 700)
@@ -383,23 +1973,34 @@ class MainWindow(QMainWindow):
         # 搜索栏
         search_layout = QHBoxLayout()
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Enter name to search")
+        self.search_input.setPlaceholderText("Enter name to search, or a query such as "
+                                             "Gender=Female AND Province IN (北京, 上海) AND Name~丽")
+        self.search_input.returnPressed.connect(self.search_data)
         self.search_button = QPushButton("Search")
         self.search_button.clicked.connect(self.search_data)
         search_layout.addWidget(self.search_input)
         search_layout.addWidget(self.search_button)
         layout.addLayout(search_layout)
 
-        # 创建表格
-        self.table = QTableWidget()
-        header = FilterHeader(self.table)
-        self.table.setHorizontalHeader(header)
-        self.table.horizontalHeader().setStretchLastSection(True)
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        # 创建表格；分页模式下使用按需读取的模型
+        self.paged = paged
+        if paged:
+            self.table = QTableView()
+            self.table.horizontalHeader().setStretchLastSection(True)
+            self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        else:
+            self.table = QTableWidget()
+            header = FilterHeader(self.table, self.column_value_counts)
+            header.sortRequested.connect(self.sort_by)
+            header.sortCleared.connect(self.clear_sort)
+            self.filter_header = header
+            self.table.setHorizontalHeader(header)
+            self.table.horizontalHeader().setStretchLastSection(True)
+            self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
         layout.addWidget(self.table)
 
         # 设置列宽比例
-        column_widths = {
+        self.column_widths = column_widths = {
             "Name": 100,
             "Gender": 60,
             "Ethnicity": 80,
@@ -436,6 +2037,9 @@ class MainWindow(QMainWindow):
         self.stats_button.setIcon(QIcon("icons/stats.png"))
         self.stats_button.setIconSize(QSize(16, 16))
 
+        self.duplicates_button = QPushButton("Find Duplicates")
+        self.diagnostics_button = QPushButton("Diagnostics")
+
         self.search_button.setIcon(QIcon("icons/search.png"))
         self.search_button.setIconSize(QSize(16, 16))
 
@@ -445,10 +2049,14 @@ class MainWindow(QMainWindow):
         self.edit_button.clicked.connect(self.edit_record)
         self.delete_button.clicked.connect(self.delete_record)
         self.stats_button.clicked.connect(self.show_statistics)
+        self.duplicates_button.clicked.connect(self.show_duplicates)
+        self.diagnostics_button.clicked.connect(self.show_diagnostics)
         button_layout.addWidget(self.add_button)
         button_layout.addWidget(self.edit_button)
         button_layout.addWidget(self.delete_button)
         button_layout.addWidget(self.stats_button)
+        button_layout.addWidget(self.duplicates_button)
+        button_layout.addWidget(self.diagnostics_button)
         layout.addLayout(button_layout)
 
         # Apply styles
@@ -456,14 +2064,14 @@ class MainWindow(QMainWindow):
             QMainWindow {
                 background-color: #f0f0f0;
             }
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 gridline-color: #d0d0d0;
                 border: 1px solid #c0c0c0;
                 border-radius: 5px;
                 font-size: 12px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
             }
             QHeaderView::section {
@@ -500,27 +2108,167 @@ class MainWindow(QMainWindow):
         """)
 
         # load data
-        self.file_path = "data\student_dataset_example.csv"
-        self.df = self.load_student_data()
-        self.display_data(self.df)
-        self.update_status_bar()
+        self.file_path = file_path
+        self.memory_budget = memory_budget
+        self.diagnostics_window = None
+        if paged:
+            self.setup_paged_mode()
+            return
 
-    def load_student_data(self):
+        self.df = pd.DataFrame()
+        self.data_version = 0
+        self.data_memory_cache = None
+        self.sort_spec = []
+        self.query_engine = QueryEngine()
+        self.value_counts = ValueCountsIndex()
+
+        # 监视数据文件，其他进程修改后增量合并；加载完成后才开始监视
+        self.saved_signature = file_signature(self.file_path)
+        self.file_watcher = QFileSystemWatcher(self)
+        self.file_watcher.fileChanged.connect(self.on_file_changed)
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(300)
+        self.reload_timer.timeout.connect(self.reload_changed_file)
+
+        # 窗口先显示出来，数据在后台线程中分块读取并逐块显示
+        self.start_loading(background)
+
+    def setup_paged_mode(self):
+        if not self.file_path.lower().endswith(".csv"):
+            # 分页读取按换行符定位行，只支持 CSV
+            QMessageBox.critical(self, "Error", "Paged mode only supports CSV data files！")
+            self.disable_paged_controls()
+            return
         try:
-            return pd.read_csv(self.file_path)
+            reader = RosterFileReader(self.file_path)
         except FileNotFoundError:
             QMessageBox.critical(self, "Error", "Student data file not found！")
-            return pd.DataFrame()
+            self.disable_paged_controls()
+            return
+
+        self.paged_model = PagedRosterModel(reader, parent=self)
+        self.table.setModel(self.paged_model)
+        self.paged_model.rowsInserted.connect(self.update_status_bar)
+        for col, column_name in enumerate(reader.columns):
+            self.table.setColumnWidth(col, self.column_widths.get(column_name, 100))
+
+        self.disable_paged_controls()
+        self.update_status_bar()
+
+    def disable_paged_controls(self):
+        # 分页模式只读浏览
+        for button in (self.add_button, self.edit_button, self.delete_button, self.stats_button,
+                       self.duplicates_button, self.search_button):
+            button.setEnabled(False)
+            button.setToolTip("Not available in paged mode")
+        self.search_input.setEnabled(False)
+
+    def loading_controls(self):
+        return (self.search_input, self.search_button, self.add_button, self.edit_button,
+                self.delete_button, self.stats_button, self.duplicates_button, self.diagnostics_button)
+
+    def start_loading(self, background=True):
+        """background 为 False 时在当前线程中同步加载（用于命令行）"""
+        self.load_started = time.perf_counter()
+        self.load_timings = {}
+        self.row_map, self.reverse_row_map = {}, {}
+        self.view_version = 0
+        # 搜索、统计等依赖索引的操作在加载完成后才可用
+        for control in self.loading_controls():
+            control.setEnabled(False)
+        self.filter_header.setSectionsClickable(False)
+        self.loading_bar = QProgressBar()
+        self.loading_bar.setRange(0, 1000)
+        self.loading_bar.setMaximumWidth(200)
+        self.status_bar.addPermanentWidget(self.loading_bar)
+        self.status_bar.showMessage("Loading student data...")
+
+        self.loader = RosterLoader(self.file_path, self)
+        self.loader.chunkLoaded.connect(self.append_loaded_rows)
+        self.loader.loadFailed.connect(self.on_loading_failed)
+        self.loader.loaded.connect(self.finish_loading)
+        if background:
+            self.loader.start()
+        else:
+            self.loader.run()
+
+    def append_loaded_rows(self, chunk, progress):
+        """把刚读完的一块数据追加到表格末尾"""
+        start = self.table.rowCount()
+        self.table.setUpdatesEnabled(False)
+        try:
+            if start == 0:
+                self.setup_columns(chunk)
+            self.table.setRowCount(start + len(chunk))
+            for i, row in enumerate(chunk.itertuples(index=False), start):
+                for j, value in enumerate(row):
+                    display_value = "No Data" if pd.isna(value) else str(value)
+                    self.table.setItem(i, j, QTableWidgetItem(display_value))
+            for i, label in enumerate(chunk.index, start):
+                self.row_map[i] = label
+                self.reverse_row_map[label] = i
+        finally:
+            self.table.setUpdatesEnabled(True)
+
+        if "first_row" not in self.load_timings and len(chunk):
+            self.load_timings["first_row"] = time.perf_counter() - self.load_started
+        self.loading_bar.setValue(progress)
+        self.status_bar.showMessage(f"Loading student data... {self.table.rowCount()} records")
+
+    def on_loading_failed(self, message):
+        # 不显示读了一半的数据，操作保持禁用，避免保存时覆盖原文件
+        self.table.setRowCount(0)
+        self.row_map, self.reverse_row_map = {}, {}
+        self.status_bar.removeWidget(self.loading_bar)
+        self.loading_bar.deleteLater()
+        self.status_bar.showMessage(message)
+        QMessageBox.critical(self, "Error", message)
+
+    def finish_loading(self, df, indexes):
+        self.df = df
+        self.data_memory_cache = None
+        self.duplicate_index, self.sort_keys, self.pinyin_index, self.cube = indexes
+        if len(df) != self.table.rowCount():
+            self.display_data(df)
+        self.load_timings["fully_loaded"] = time.perf_counter() - self.load_started
+
+        self.status_bar.removeWidget(self.loading_bar)
+        self.loading_bar.deleteLater()
+        for control in self.loading_controls():
+            control.setEnabled(True)
+        self.filter_header.setSectionsClickable(True)
+
+        if os.path.exists(self.file_path):
+            self.file_watcher.addPath(self.file_path)
+            if file_signature(self.file_path) != self.saved_signature:
+                # 加载期间文件被其他程序修改过
+                self.reload_timer.start()
+
+        self.enforce_memory_budget()
+        first_row = self.load_timings.get("first_row")
+        first_row_text = f"first rows after {first_row:.2f}s, " if first_row is not None else ""
+        self.status_bar.showMessage(f"Current record count: {self.table.rowCount()} "
+                                    f"({first_row_text}fully loaded after {self.load_timings['fully_loaded']:.2f}s)")
+
+    def closeEvent(self, event):
+        loader = getattr(self, 'loader', None)
+        if loader is not None and loader.isRunning():
+            loader.requestInterruption()
+            loader.wait()
+        super().closeEvent(event)
 
     def display_data(self, df):
-        # 临时关闭排序，提高性能
-        self.table.setSortingEnabled(False)
         self.table.setUpdatesEnabled(False)
 
         try:
+            df = self.sorted_view(df)
             # 设置行数和列数，应用列宽设置
             self.setup_columns(df)
             self.table.setRowCount(len(df))
+            self.row_map = dict(enumerate(df.index))
+            self.reverse_row_map = {v: k for k, v in self.row_map.items()}
+            self.view_version += 1
 
             # 使用批量更新来提高性能
             items = []
@@ -535,18 +2283,23 @@ class MainWindow(QMainWindow):
                 self.table.setItem(i, j, item)
 
         finally:
-            # 恢复更新和排序
+            # 恢复更新
             self.table.setUpdatesEnabled(True)
-            self.table.setSortingEnabled(True)
             # 强制刷新表格
             self.table.viewport().update()
 
     def update_status_bar(self):
+        if self.paged:
+            if hasattr(self, 'paged_model'):
+                self.status_bar.showMessage(f"Current record count: {self.paged_model.total_rows()} "
+                                            f"(loaded {self.paged_model.rowCount()})")
+            return
         record_count = self.table.rowCount()
         self.status_bar.showMessage(f"Current record count: {record_count}")
 
     def search_data(self):
-        search_term = self.search_input.text().strip().lower()
+        query = self.search_input.text().strip()
+        search_term = query.lower()
 
         if not search_term:
             # 显示所有数据
@@ -554,13 +2307,33 @@ class MainWindow(QMainWindow):
             return
 
         try:
-            # 改进搜索逻辑，使用更精确的匹配
-            mask = self.df.apply(lambda row: any(
-                str(cell).strip().lower().find(search_term) >= 0
-                for cell in row if pd.notna(cell)  # 只搜索非空值
-            ), axis=1)
-
-            filtered_df = self.df[mask]
+            ranked = None
+            if looks_like_query(query):
+                # 组合查询：编译为向量化掩码，按数据版本缓存
+                try:
+                    mask = self.query_engine.evaluate(self.df, query, self.data_version)
+                except QuerySyntaxError as e:
+                    QMessageBox.warning(self, "Warning", f"Invalid query: {str(e)}")
+                    return
+            else:
+                # 按各列的不同取值做子串匹配；字母查询同时按姓名和专业的拼音匹配
+                mask = self.query_engine.contains(self.df, search_term, self.data_version)
+                if search_term.isascii():
+                    scores = self.pinyin_index.match_scores(self.df, search_term)
+                    mask |= scores > 0
+                    if not mask.any():
+                        # 没有精确结果时按拼音容错匹配，结果按相似度排序
+                        ranked = self.pinyin_index.fuzzy_scores(self.df, search_term)
+                    elif scores.any():
+                        # 拼音匹配程度高的排在前面，程度相同的保持当前排序
+                        view = self.sorted_view(self.df[mask])
+                        ranked = pd.Series(scores, index=self.df.index).loc[view.index]
+                        ranked = ranked.sort_values(ascending=False, kind="stable")
+
+            if ranked is not None:
+                filtered_df = self.df.loc[ranked.index]
+            else:
+                filtered_df = self.sorted_view(self.df[mask])
 
             if filtered_df.empty:
                 QMessageBox.information(self, "Hint", "No matching records found")
@@ -569,25 +2342,26 @@ class MainWindow(QMainWindow):
             # 显示筛选后的数据
             self.table.setUpdatesEnabled(False)
             try:
-                self.display_filtered_data(filtered_df, mask)
+                self.display_filtered_data(filtered_df)
             finally:
                 self.table.setUpdatesEnabled(True)
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error during search: {str(e)}")
 
+        self.enforce_memory_budget()
         self.update_status_bar()
 
-    def display_filtered_data(self, filtered_df, mask):
+    def display_filtered_data(self, filtered_df):
         """显示筛选后的数据，保持原始数据索引"""
-        self.table.setSortingEnabled(False)
         self.table.setRowCount(len(filtered_df))
         self.table.setColumnCount(len(filtered_df.columns))
         self.table.setHorizontalHeaderLabels(filtered_df.columns)
 
         # 创建映射表：显示行号 -> 原始数据索引
-        self.row_map = dict(enumerate(self.df.index[mask]))
+        self.row_map = dict(enumerate(filtered_df.index))
         self.reverse_row_map = {v: k for k, v in self.row_map.items()}
+        self.view_version += 1
 
         for display_row, (_, row) in enumerate(filtered_df.iterrows()):
             for col, value in enumerate(row):
@@ -595,7 +2369,265 @@ class MainWindow(QMainWindow):
                 item = QTableWidgetItem(display_value)
                 self.table.setItem(display_row, col, item)
 
-        self.table.setSortingEnabled(True)
+    def sorted_view(self, df):
+        """按当前排序规则重排 df（self.df 或其子集）"""
+        if not self.sort_spec or df.empty:
+            return df
+        labels = self.sort_keys.sort(self.df, self.sort_spec)
+        if len(df) != len(self.df):
+            labels = labels[np.isin(labels, df.index.to_numpy())]
+        return self.df.loc[labels]
+
+    def sort_by(self, column, ascending, append):
+        column_name = self.df.columns[column]
+        spec = [s for s in self.sort_spec if s[0] != column_name] if append else []
+        spec.append((column_name, ascending))
+        self.sort_spec = spec
+        self.apply_sort()
+
+    def clear_sort(self):
+        self.sort_spec = []
+        self.apply_sort()
+
+    def apply_sort(self):
+        # 只对当前显示的行重排，保留搜索结果和列筛选
+        view_labels = list(getattr(self, 'row_map', {}).values())
+        rows = self.df[self.df.index.isin(view_labels)]
+
+        header = self.filter_header
+        header.setSortIndicatorShown(bool(self.sort_spec))
+        if self.sort_spec:
+            column_name, ascending = self.sort_spec[0]
+            header.setSortIndicator(self.df.columns.get_loc(column_name),
+                                    Qt.SortOrder.AscendingOrder if ascending else Qt.SortOrder.DescendingOrder)
+
+        self.table.setUpdatesEnabled(False)
+        try:
+            self.display_filtered_data(self.sorted_view(rows))
+            header.update_table()
+        finally:
+            self.table.setUpdatesEnabled(True)
+
+    def save_data(self):
+        write_roster(self.df, self.file_path)
+        self.saved_signature = file_signature(self.file_path)
+
+    def on_file_changed(self, path):
+        # 写文件时会连续触发多次，稍后统一处理
+        self.reload_timer.start()
+
+    def reload_changed_file(self):
+        # 原子替换后文件会从监视列表中移除，需要重新添加
+        if os.path.exists(self.file_path) and self.file_path not in self.file_watcher.files():
+            self.file_watcher.addPath(self.file_path)
+
+        signature = file_signature(self.file_path)
+        if signature is None or signature == self.saved_signature:
+            return
+
+        # 合并成功后才记录签名，失败时下次文件变化会再次尝试，
+        # 也不会在保存时用旧数据覆盖外部修改
+        try:
+            new_df = read_roster(self.file_path)
+            if list(new_df.columns) == list(self.df.columns):
+                new_df, changed, inserted, deleted = diff_rows(self.df, new_df)
+        except Exception as e:
+            self.status_bar.showMessage(f"Failed to reload changed data file: {str(e)}")
+            return
+        self.saved_signature = signature
+
+        if list(new_df.columns) != list(self.df.columns):
+            # 列结构变化，只能整体重新加载
+            self.df = new_df
+            self.refresh_indexes()
+            self.display_data(self.df)
+            self.update_status_bar()
+            return
+
+        self.df = new_df
+        if not (changed or inserted or deleted):
+            return
+        self.refresh_indexes(changed + inserted + deleted)
+        self.apply_row_changes(changed, inserted, deleted)
+        self.status_bar.showMessage(f"Data file changed externally: {len(changed)} changed, "
+                                    f"{len(inserted)} added, {len(deleted)} deleted "
+                                    f"(current record count: {len(self.df)})")
+
+    def apply_row_changes(self, changed, inserted, deleted):
+        """只更新表格中受影响的行"""
+        row_map = getattr(self, 'row_map', {})
+        if len(changed) + len(inserted) + len(deleted) > max(100, len(row_map) // 10):
+            # 变化太多时整表重绘更快
+            self.display_data(self.df)
+            return
+
+        deleted_labels = set(deleted)
+        reverse_row_map = {label: display_row for display_row, label in row_map.items()}
+        showing_all = len(row_map) == len(self.df) - len(inserted) + len(deleted)
+
+        self.table.setUpdatesEnabled(False)
+        try:
+            for label in changed:
+                display_row = reverse_row_map.get(label)
+                if display_row is None:
+                    continue
+                for col, value in enumerate(self.df.loc[label]):
+                    display_value = "No Data" if pd.isna(value) else str(value)
+                    self.table.item(display_row, col).setText(display_value)
+
+            for display_row in sorted((reverse_row_map[label] for label in deleted if label in reverse_row_map),
+                                      reverse=True):
+                self.table.removeRow(display_row)
+            labels = [label for _, label in sorted(row_map.items()) if label not in deleted_labels]
+
+            # 新增的行只在显示全部数据时追加到末尾
+            if showing_all:
+                for label in inserted:
+                    display_row = self.table.rowCount()
+                    self.table.insertRow(display_row)
+                    for col, value in enumerate(self.df.loc[label]):
+                        display_value = "No Data" if pd.isna(value) else str(value)
+                        self.table.setItem(display_row, col, QTableWidgetItem(display_value))
+                    labels.append(label)
+
+            self.row_map = dict(enumerate(labels))
+            self.reverse_row_map = {v: k for k, v in self.row_map.items()}
+            self.view_version += 1
+            self.filter_header.update_table()
+        finally:
+            self.table.setUpdatesEnabled(True)
+
+    def column_value_counts(self, logical_index):
+        # 与表格一致，只统计当前显示的行（例如搜索结果）；数据或显示的行变化后重新统计
+        rows = self.df
+        if len(self.row_map) != len(self.df):
+            rows = self.df.loc[list(self.row_map.values())]
+        return self.value_counts.get(rows, self.df.columns[logical_index], (self.data_version, self.view_version))
+
+    def refresh_indexes(self, labels=None):
+        """数据修改后同步各索引；labels 为 None 时全部重建"""
+        self.data_version += 1
+        for index in (self.duplicate_index, self.sort_keys, self.pinyin_index, self.cube):
+            if labels is None:
+                index.rebuild(self.df)
+            else:
+                index.update_rows(self.df, labels)
+        self.update_data_memory(labels)
+        self.enforce_memory_budget()
+
+    def update_data_memory(self, labels):
+        # 整体重建或累计修改的行数较多时才重新测量数据列，逐行修改沿用上次的测量结果
+        cached = self.data_memory_cache
+        if cached is None:
+            return
+        if labels is not None:
+            cached["changed_rows"] += len(labels)
+        if labels is None or cached["changed_rows"] > max(len(self.df) // self.DATA_MEMORY_DRIFT, 1):
+            self.data_memory_cache = None
+
+    def data_memory(self):
+        """数据列、行索引的字节数和全部文本的字符数；缓存到数据整体重建或累计修改较多时"""
+        if self.data_memory_cache is None:
+            # deep=True 和文本长度要遍历每个值，大数据量下耗时数秒
+            self.data_memory_cache = {
+                "changed_rows": 0,
+                "columns": [(column, int(self.df[column].memory_usage(deep=True, index=False)))
+                            for column in self.df.columns],
+                "index": int(self.df.index.memory_usage(deep=True)),
+                "text_chars": sum(int(self.df[column].astype(str).str.len().sum()) for column in self.df.columns),
+                "rows": len(self.df),
+            }
+        return self.data_memory_cache
+
+    def cache_report(self):
+        """可清除的缓存，[(类别, 组件, 字节数)]"""
+        if self.paged:
+            if not hasattr(self, 'paged_model'):
+                return []
+            return [("Cache", "Paged row blocks", deep_size(self.paged_model.cache.blocks))]
+        sort_keys, cube, engine = self.sort_keys, self.cube, self.query_engine
+        return [
+            ("Cache", "Query masks", deep_size(engine.masks)),
+            ("Cache", "Query column codes", deep_size(engine.columns)),
+            ("Cache", "Query plans", deep_size(engine.plans)),
+            ("Cache", "Sort permutations", deep_size(sort_keys.permutations)),
+            ("Cache", "Collation keys", deep_size(sort_keys.collation_keys)),
+            ("Cache", "Pinyin joined keys", deep_size(self.pinyin_index.key_text)),
+            ("Cache", "Statistics cube frame", deep_size(cube._frame) if cube._frame is not None else 0),
+            ("Cache", "Filter value counts", deep_size(self.value_counts.columns)),
+        ]
+
+    def memory_report(self):
+        """返回 [(类别, 组件, 字节数)]"""
+        report = []
+        if self.paged:
+            if hasattr(self, 'paged_model'):
+                report.append(("Index", "Paged block offsets", deep_size(self.paged_model.reader.block_offsets)))
+            return report + self.cache_report()
+
+        data = self.data_memory()
+        for column, size in data["columns"]:
+            report.append(("Data", f"Column {column}", size))
+        report.append(("Data", "Row index", data["index"]))
+
+        duplicates, sort_keys, cube = self.duplicate_index, self.sort_keys, self.cube
+        report.append(("Index", "Duplicate index",
+                       deep_size([duplicates.keys, duplicates.key_ids, duplicates.sizes, duplicates.block_ids,
+                                  duplicates.variant_hashes, duplicates.variant_offsets, duplicates.variant_gids,
+                                  duplicates.extra_variants, duplicates.row_ids])))
+        report.append(("Index", "Sort ranks", deep_size([sort_keys.ranks, sort_keys.value_ranks])))
+        pinyin = self.pinyin_index
+        report.append(("Index", "Pinyin keys",
+                       deep_size([pinyin.values, pinyin.value_ids, pinyin.keys, pinyin.full,
+                                  pinyin.initials, pinyin.grams, pinyin.row_ids])))
+        report.append(("Index", "Statistics cube", deep_size([cube.cells, cube.cell_ids, cube.counts, cube.row_cells])))
+        report.extend(self.cache_report())
+
+        # 表格项无法直接测量，按项数和文本长度估算
+        rows, columns = self.table.rowCount(), self.table.columnCount()
+        text_bytes = 2 * data["text_chars"] * rows // max(data["rows"], 1)
+        report.append(("View", "Table items (estimated)", rows * columns * self.TABLE_ITEM_BYTES + text_bytes))
+        report.append(("View", "Row maps", deep_size([getattr(self, 'row_map', {}),
+                                                     getattr(self, 'reverse_row_map', {})])))
+        return report
+
+    def cache_evictors(self):
+        """可丢弃的缓存，按驱逐优先级排列（最便宜重建的在前）"""
+        if self.paged:
+            return [("Paged row blocks", self.paged_model.cache.clear)] if hasattr(self, 'paged_model') else []
+        return [
+            ("Query masks", self.query_engine.masks.clear),
+            ("Sort permutations", self.sort_keys.permutations.clear),
+            ("Statistics cube frame", self.cube.clear_cache),
+            ("Pinyin joined keys", self.pinyin_index.key_text.clear),
+            ("Filter value counts", self.value_counts.clear),
+            ("Query plans", self.query_engine.plans.clear),
+            ("Query column codes", self.query_engine.columns.clear),
+            ("Collation keys", self.sort_keys.collation_keys.clear),
+        ]
+
+    def evict_caches(self):
+        for _, evict in self.cache_evictors():
+            evict()
+
+    def enforce_memory_budget(self):
+        """超出预算时按优先级逐个清除缓存，返回被清除的缓存名称"""
+        if not self.memory_budget:
+            return []
+        # 数据、索引和表格部分在清除缓存时不变，只需测量一次；每清除一项后只重新测量缓存
+        caches = self.cache_report()
+        cache_names = {component for _, component, _ in caches}
+        fixed = sum(size for _, component, size in self.memory_report() if component not in cache_names)
+        evicted = []
+        for name, evict in self.cache_evictors():
+            if fixed + sum(size for _, _, size in caches) <= self.memory_budget:
+                break
+            evict()
+            evicted.append(name)
+            caches = self.cache_report()
+        if evicted:
+            print(f"Memory budget exceeded, cleared: {', '.join(evicted)}")
+        return evicted
 
     def add_record(self):
         valid_departments = set(self.df["Department"].unique())
@@ -668,14 +2700,28 @@ class MainWindow(QMainWindow):
             if required and column not in new_values:
                 return
 
+        # 重复检查：同院系、省份、性别下的同名或近似姓名
+        matches = self.duplicate_index.check(new_values)
+        if matches:
+            lines = [f"{name} ({count} record{'s' if count > 1 else ''}, {'same name' if exact else 'similar name'})"
+                     for name, count, exact in matches[:10]]
+            reply = QMessageBox.question(self, "Possible Duplicate",
+                                         "Students with the same department, province and gender already exist:\n"
+                                         + "\n".join(lines) + "\n\nDo you still want to add this record?",
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply == QMessageBox.StandardButton.No:
+                return
+
         try:
             # 添加新记录
+            new_label = int(self.df.index.max()) + 1 if len(self.df) else 0
             new_row = pd.DataFrame([{
                 col: new_values.get(col, None) for col in self.df.columns
-            }])
+            }], index=[new_label])
 
-            self.df = pd.concat([self.df, new_row], ignore_index=True)
-            self.df.to_excel(self.file_path, index=False)
+            self.df = pd.concat([self.df, new_row])
+            self.refresh_indexes([new_label])
+            self.save_data()
             self.display_data(self.df)
             self.update_status_bar()
             QMessageBox.information(self, "Success", "Record added successfully!")
@@ -697,7 +2743,7 @@ class MainWindow(QMainWindow):
             # 获取原始数据行索引
             selected = self.get_original_row_index(display_row)
             valid_departments = set(self.df["Department"].unique())
-            current_record = self.df.iloc[selected]
+            current_record = self.df.loc[selected]
 
             # 如果选择了特定列（单击某个单元格）
             if selected_col >= 0:
@@ -757,10 +2803,11 @@ class MainWindow(QMainWindow):
                     # 更新单个字段的数据
                     value = None if value == "" else value  # 空字符串转换为 None
                     self.df.at[selected, column_name] = value
+                    self.refresh_indexes([selected])
 
                     # 保存到文件
                     QApplication.processEvents()  # 处理待处理的事件
-                    self.df.to_excel(self.file_path, index=False)
+                    self.save_data()
 
                     # 只更新修改的单元格
                     display_value = "No Data" if pd.isna(value) else str(value)
@@ -829,10 +2876,11 @@ class MainWindow(QMainWindow):
                     for column, value in new_values.items():
                         value = None if value == "" else value
                         self.df.at[selected, column] = value
+                    self.refresh_indexes([selected])
 
                     # 保存到文件
                     QApplication.processEvents()  # 处理待处理的事件
-                    self.df.to_excel(self.file_path, index=False)
+                    self.save_data()
 
                     # 更新表格显示
                     for col, column_name in enumerate(self.df.columns):
@@ -901,8 +2949,9 @@ class MainWindow(QMainWindow):
                 if current_value == "No Data":
                     if clicked_button == btn_yes:
                         # 删除整行
-                        self.df = self.df.drop(original_row).reset_index(drop=True)
-                        self.df.to_excel(self.file_path, index=False)
+                        self.df = self.df.drop(original_row)
+                        self.refresh_indexes([original_row])
+                        self.save_data()
                         self.display_data(self.df)
                         success_msg = "Entire row record deleted"
                     else:
@@ -911,12 +2960,14 @@ class MainWindow(QMainWindow):
                     if clicked_button == btn_delete_cell:
                         # 仅删除单元格内容
                         self.df.at[original_row, column_name] = None
+                        self.refresh_indexes([original_row])
                         self.table.item(display_row, selected_col).setText("No Data")
                         success_msg = f"{column_name} information deleted"
                     elif clicked_button == btn_delete_row:
                         # 删除整行
-                        self.df = self.df.drop(original_row).reset_index(drop=True)
-                        self.df.to_excel(self.file_path, index=False)
+                        self.df = self.df.drop(original_row)
+                        self.refresh_indexes([original_row])
+                        self.save_data()
                         self.display_data(self.df)
                         success_msg = "Entire row record deleted"
                     else:
@@ -940,23 +2991,489 @@ class MainWindow(QMainWindow):
             msg_box.exec()
             if msg_box.clickedButton() == btn_yes:
                 try:
-                    self.df = self.df.drop(original_row).reset_index(drop=True)
-                    self.df.to_excel(self.file_path, index=False)
+                    self.df = self.df.drop(original_row)
+                    self.refresh_indexes([original_row])
+                    self.save_data()
                     self.display_data(self.df)
                     self.update_status_bar()
                     QMessageBox.information(self, "Success", "Record deleted successfully!")
                 except Exception as e:
                     QMessageBox.critical(self, "Error", f"Failed to delete record: {str(e)}")
 
+    def show_duplicates(self):
+        exact, near = self.duplicate_index.find_duplicates()
+        if not exact and not near:
+            QMessageBox.information(self, "Hint", "No duplicate records found")
+            return
+
+        gids = set(exact)
+        for a, b in near:
+            gids.update((a, b))
+        rows = self.duplicate_index.rows_in_groups(gids)
+        # 按分块和姓名排序，使重复记录相邻显示
+        filtered_df = self.df.loc[rows].sort_values(DuplicateIndex.BLOCK_COLUMNS + ["Name"])
+
+        self.table.setUpdatesEnabled(False)
+        try:
+            self.display_filtered_data(filtered_df)
+        finally:
+            self.table.setUpdatesEnabled(True)
+        self.update_status_bar()
+        QMessageBox.information(self, "Duplicates",
+                                f"Exact duplicate groups: {len(exact)}\nSimilar name pairs: {len(near)}")
+
     def show_statistics(self):
-        self.stats_window = StatisticsWindow(self.df)
+        self.stats_window = StatisticsWindow(self.cube)
         self.stats_window.show()
 
+    def show_diagnostics(self):
+        if self.diagnostics_window is None:
+            self.diagnostics_window = DiagnosticsWindow(self)
+        self.diagnostics_window.refresh()
+        self.diagnostics_window.show()
+
+
+class StoreError(Exception):
+    def __init__(self, status, message, **extra):
+        super().__init__(message)
+        self.status = status
+        self.extra = extra
+
+
+class ReadWriteLock:
+    """多个读者可同时持有；写者独占，且等待中的写者优先"""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+
+    def acquire_read(self):
+        with self.cond:
+            while self.writer or self.waiting_writers:
+                self.cond.wait()
+            self.readers += 1
+
+    def release_read(self):
+        with self.cond:
+            self.readers -= 1
+            if self.readers == 0:
+                self.cond.notify_all()
+
+    def acquire_write(self):
+        with self.cond:
+            self.waiting_writers += 1
+            while self.writer or self.readers:
+                self.cond.wait()
+            self.waiting_writers -= 1
+            self.writer = True
+
+    def release_write(self):
+        with self.cond:
+            self.writer = False
+            self.cond.notify_all()
+
+
+class StudentStore:
+    """服务模式下的学生数据：行号即记录 id，每条记录带版本号用于乐观并发控制"""
+    MAX_PAGE_SIZE = 500
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.lock = ReadWriteLock()
+        # 写文件在读写锁之外进行，只用 file_lock 串行化
+        self.file_lock = threading.Lock()
+        self.save_sequence = 0
+        self.saved_sequence = 0
+        self.df = read_roster(file_path)
+        self.versions = dict.fromkeys(self.df.index.tolist(), 1)
+        self.next_id = int(self.df.index.max()) + 1 if len(self.df) else 0
+
+    def to_item(self, record_id, row):
+        item = {"id": int(record_id), "version": self.versions[record_id]}
+        for column in self.df.columns:
+            value = row[column]
+            item[column] = None if pd.isna(value) else value
+        return item
+
+    def to_items(self, rows):
+        records = rows.astype(object).where(rows.notna(), None).to_dict("records")
+        return [{"id": int(record_id), "version": self.versions[record_id], **record}
+                for record_id, record in zip(rows.index.tolist(), records)]
+
+    def validate(self, record, partial=False):
+        valid_departments = set(self.df["Department"].dropna().unique())
+        validators = {
+            "Name": validate_name,
+            "Gender": validate_gender,
+            "Department": lambda value: validate_department(value, valid_departments),
+            "Major": validate_major,
+            "Ethnicity": validate_ethnicity,
+            "Province": validate_province,
+        }
+        unknown = set(record) - set(COLUMNS_ORDER)
+        if unknown:
+            raise StoreError(400, f"Unknown fields: {', '.join(sorted(unknown))}")
+        values = {}
+        for column in COLUMNS_ORDER:
+            if column not in record:
+                if not partial and column in ("Name", "Gender", "Department", "Major"):
+                    raise StoreError(400, f"{column} is required")
+                continue
+            value = record[column]
+            if value is not None and not isinstance(value, str):
+                raise StoreError(400, f"{column} must be a string or null")
+            value = value or None
+            if value is None and column in ("Name", "Gender", "Department", "Major"):
+                raise StoreError(400, f"{column} is a required field and cannot be empty")
+            if value is not None:
+                valid, msg = validators[column](value)
+                if not valid:
+                    raise StoreError(400, msg)
+            values[column] = value
+        return values
+
+    def _check_version(self, record_id, version):
+        if record_id not in self.versions:
+            raise StoreError(404, "Record not found")
+        if version is None:
+            raise StoreError(428, "A record version is required")
+        if int(version) != self.versions[record_id]:
+            raise StoreError(409, "Record was modified by another client",
+                             current=self.to_item(record_id, self.df.loc[record_id]))
+
+    def _mask(self, filters, search):
+        mask = np.ones(len(self.df), dtype=bool)
+        for column, values in filters.items():
+            mask &= self.df[column].isin(values).to_numpy()
+        if search:
+            search = search.strip().lower()
+            hits = np.zeros(len(self.df), dtype=bool)
+            for column in self.df.columns:
+                hits |= self.df[column].astype(str).str.lower().str.contains(search, regex=False).to_numpy() \
+                        & self.df[column].notna().to_numpy()
+            mask &= hits
+        return mask
+
+    def list(self, filters=None, search="", page=1, page_size=50):
+        page = max(int(page), 1)
+        page_size = min(max(int(page_size), 1), self.MAX_PAGE_SIZE)
+        self.lock.acquire_read()
+        try:
+            filters = filters or {}
+            unknown = set(filters) - set(self.df.columns)
+            if unknown:
+                raise StoreError(400, f"Unknown fields: {', '.join(sorted(unknown))}")
+            rows = self.df[self._mask(filters, search)] if filters or search else self.df
+            page_rows = rows.iloc[(page - 1) * page_size:page * page_size]
+            return {
+                "total": len(rows),
+                "page": page,
+                "page_size": page_size,
+                "items": self.to_items(page_rows),
+            }
+        finally:
+            self.lock.release_read()
+
+    def get(self, record_id):
+        self.lock.acquire_read()
+        try:
+            if record_id not in self.versions:
+                raise StoreError(404, "Record not found")
+            return self.to_item(record_id, self.df.loc[record_id])
+        finally:
+            self.lock.release_read()
+
+    def stats(self, column="Department"):
+        self.lock.acquire_read()
+        try:
+            if column not in self.df.columns:
+                raise StoreError(400, f"Unknown field: {column}")
+            counts = self.df[column].value_counts()
+            return {"total": len(self.df), "by": column,
+                    "counts": {str(key): int(value) for key, value in counts.items()}}
+        finally:
+            self.lock.release_read()
+
+    def create(self, record):
+        self.lock.acquire_write()
+        try:
+            values = self.validate(record)
+            record_id = self.next_id
+            self.df.loc[record_id] = [values.get(column) for column in self.df.columns]
+            self.versions[record_id] = 1
+            self.next_id += 1
+            item = self.to_item(record_id, self.df.loc[record_id])
+            snapshot = self.snapshot()
+        finally:
+            self.lock.release_write()
+        self.save(snapshot)
+        return item
+
+    def update(self, record_id, record, version):
+        self.lock.acquire_write()
+        try:
+            self._check_version(record_id, version)
+            for column, value in self.validate(record, partial=True).items():
+                self.df.at[record_id, column] = value
+            self.versions[record_id] += 1
+            item = self.to_item(record_id, self.df.loc[record_id])
+            snapshot = self.snapshot()
+        finally:
+            self.lock.release_write()
+        self.save(snapshot)
+        return item
+
+    def delete(self, record_id, version):
+        self.lock.acquire_write()
+        try:
+            self._check_version(record_id, version)
+            self.df = self.df.drop(record_id)
+            del self.versions[record_id]
+            snapshot = self.snapshot()
+        finally:
+            self.lock.release_write()
+        self.save(snapshot)
+
+    def snapshot(self):
+        # 调用方持有写锁；复制是写时复制的，代价远小于写文件
+        self.save_sequence += 1
+        return self.save_sequence, self.df.copy()
+
+    def save(self, snapshot):
+        """在读写锁之外写文件，读请求不必等待；排队的旧快照被新快照取代时直接跳过"""
+        sequence, df = snapshot
+        with self.file_lock:
+            if sequence <= self.saved_sequence:
+                return
+            write_roster(df, self.file_path)
+            self.saved_sequence = sequence
+
+
+class StudentRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET    /students?page=&page_size=&q=&<Column>=<value>   分页查询
+    GET    /students/<id>                                  单条记录
+    POST   /students                                       新增
+    PUT    /students/<id>   {"version": n, ...}             修改
+    DELETE /students/<id>?version=n                        删除
+    GET    /stats?by=<Column>                              统计
+    """
+    protocol_version = "HTTP/1.1"
+    # 响应头和响应体分两次写出，关闭 Nagle 以免 keep-alive 连接上每次请求多等 40ms
+    disable_nagle_algorithm = True
+    store = None
+    verbose = False
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            payload = json.loads(self.rfile.read(length).decode("utf-8"))
+        except ValueError:
+            raise StoreError(400, "Request body must be valid JSON")
+        if not isinstance(payload, dict):
+            raise StoreError(400, "Request body must be a JSON object")
+        return payload
+
+    def route(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        query = parse_qs(url.query)
+        record_id = None
+        if len(parts) == 2 and parts[0] == "students":
+            try:
+                record_id = int(parts[1])
+            except ValueError:
+                raise StoreError(404, "Record not found")
+        elif len(parts) != 1 or parts[0] not in ("students", "stats"):
+            raise StoreError(404, "Not found")
+        return parts[0], record_id, query
+
+    def handle_request(self, method):
+        try:
+            resource, record_id, query = self.route()
+            if resource == "stats":
+                if method != "GET":
+                    raise StoreError(405, "Method not allowed")
+                self.send_json(200, self.store.stats(query.get("by", ["Department"])[0]))
+            elif record_id is None and method == "GET":
+                filters = {key: values for key, values in query.items()
+                           if key not in ("page", "page_size", "q")}
+                self.send_json(200, self.store.list(filters,
+                                                    query.get("q", [""])[0],
+                                                    query.get("page", [1])[0],
+                                                    query.get("page_size", [50])[0]))
+            elif record_id is None and method == "POST":
+                self.send_json(201, self.store.create(self.read_json()))
+            elif record_id is not None and method == "GET":
+                self.send_json(200, self.store.get(record_id))
+            elif record_id is not None and method == "PUT":
+                payload = self.read_json()
+                version = payload.pop("version", None)
+                self.send_json(200, self.store.update(record_id, payload, version))
+            elif record_id is not None and method == "DELETE":
+                version = query.get("version", [self.headers.get("If-Match")])[0]
+                self.store.delete(record_id, version)
+                self.send_json(200, {"id": record_id, "deleted": True})
+            else:
+                raise StoreError(405, "Method not allowed")
+        except StoreError as e:
+            self.send_json(e.status, {"error": str(e), **e.extra})
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+        except Exception as e:
+            self.send_json(500, {"error": f"Internal error: {str(e)}"})
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def do_PUT(self):
+        self.handle_request("PUT")
+
+    def do_DELETE(self):
+        self.handle_request("DELETE")
+
+
+class StudentHTTPServer(ThreadingHTTPServer):
+    # 默认的监听队列只有 5，并发连接较多时会被重置
+    request_queue_size = 128
+
+
+def run_server(file_path, host="127.0.0.1", port=8000, verbose=False):
+    StudentRequestHandler.store = StudentStore(file_path)
+    StudentRequestHandler.verbose = verbose
+    server = StudentHTTPServer((host, port), StudentRequestHandler)
+    print(f"Serving {file_path} on http://{host}:{port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def report_file_name(name):
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", name).strip("_") or "report"
+
+
+def render_report(title, df, bar_column, out_dir, formats):
+    """离屏渲染一份报表（性别饼图 + 柱状图），在进程池的子进程中运行"""
+    start = time.perf_counter()
+    gender_counts = df["Gender"].value_counts()
+    bar_counts = df[bar_column].value_counts()
+
+    figure = Figure(figsize=(12, 6), layout="constrained")
+    FigureCanvasAgg(figure)
+    draw_gender_pie(figure.add_subplot(1, 2, 1), gender_counts, f"{title}\nGender Distribution")
+    draw_count_bar(figure.add_subplot(1, 2, 2), bar_counts, f"{title}\n{bar_column} Population", bar_column)
+
+    files = []
+    for fmt in formats:
+        path = os.path.join(out_dir, f"{report_file_name(title)}.{fmt}")
+        figure.savefig(path, format=fmt)
+        files.append(path)
+
+    return {
+        "Report": title,
+        "Students": len(df),
+        "Female": int(gender_counts.get("Female", 0)),
+        "Male": int(gender_counts.get("Male", 0)),
+        "Breakdown": bar_column,
+        "Groups": len(bar_counts),
+        "Seconds": round(time.perf_counter() - start, 3),
+        "Files": ";".join(files),
+    }
+
+
+def run_batch_reports(file_path, out_dir, formats=("png", "pdf"), workers=None):
+    """为每个院系生成报表，另加一份全校按院系统计的报表，并写出 summary.csv"""
+    start = time.perf_counter()
+    df = read_roster(file_path)
+    os.makedirs(out_dir, exist_ok=True)
+
+    jobs = [("All Departments", df, "Department")]
+    jobs += [(str(department), rows, "Major") for department, rows in df.groupby("Department", sort=True)]
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(render_report, title, rows, bar_column, out_dir, formats)
+                   for title, rows, bar_column in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            print(f"{result['Seconds']:>7.2f}s  {result['Report']} ({result['Students']} students)")
+            results[result["Report"]] = result
+
+    summary = pd.DataFrame([results[title] for title, _, _ in jobs])
+    summary_path = os.path.join(out_dir, "summary.csv")
+    summary.to_csv(summary_path, index=False)
+    print(f"Wrote {len(results)} reports and {summary_path} in {time.perf_counter() - start:.2f}s")
+
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="Student Basic Information Management")
+    parser.add_argument("--serve", action="store_true", help="serve the student data over a local HTTP JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--data", default=DATA_FILE, help="student data file")
+    parser.add_argument("--verbose", action="store_true", help="log every HTTP request")
+    parser.add_argument("--paged", action="store_true",
+                        help="browse a large CSV roster read-only, loading rows from disk as you scroll")
+    parser.add_argument("--migrate-accounts", nargs="?", const=ACCOUNT_TEXT_FILE, metavar="USER_TXT",
+                        help=f"import username:password lines into {ACCOUNT_DB_FILE} with hashed passwords")
+    parser.add_argument("--report", metavar="OUT_DIR",
+                        help="render per-department statistics reports offscreen into OUT_DIR and exit")
+    parser.add_argument("--report-format", default="png,pdf", help="comma-separated output formats")
+    parser.add_argument("--workers", type=int, default=None, help="report worker processes (default: CPU count)")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="load the data, print per-component memory usage and exit")
+    parser.add_argument("--memory-budget", type=float, metavar="MB",
+                        help="clear caches in priority order when memory use exceeds this many MB")
+    args, qt_args = parser.parse_known_args()
+    if args.paged and not args.data.lower().endswith(".csv"):
+        parser.error("--paged only supports CSV data files")
+    memory_budget = int(args.memory_budget * 1024 * 1024) if args.memory_budget else None
+
+    if args.report:
+        run_batch_reports(args.data, args.report, tuple(args.report_format.split(",")), args.workers)
+        sys.exit(0)
+
+    if args.migrate_accounts:
+        count = AccountStore().migrate_from_text(args.migrate_accounts)
+        print(f"Imported {count} accounts into {ACCOUNT_DB_FILE}")
+        sys.exit(0 if count else 1)
+
+    if args.serve:
+        run_server(args.data, args.host, args.port, args.verbose)
+        sys.exit(0)
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    if args.memory_report:
+        window = MainWindow(args.data, paged=args.paged, memory_budget=memory_budget, background=False)
+        if not args.paged and "fully_loaded" not in window.load_timings:
+            sys.exit(1)
+        print(format_memory_report(window.memory_report(), memory_budget))
+        sys.exit(0)
+
     login_dialog = LoginDialog()
     if login_dialog.exec() == QDialog.DialogCode.Accepted:
-        main_window = MainWindow()
+        main_window = MainWindow(args.data, paged=args.paged, memory_budget=memory_budget)
         main_window.show()
     sys.exit(app.exec())
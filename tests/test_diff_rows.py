@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from main import diff_rows  # noqa: E402
+
+
+def make_roster():
+    return pd.DataFrame({
+        "Name": ["张三", "李四", "王五", "赵六", "钱七", "孙八"],
+        "Gender": ["Male", "Female", "Male", "Female", "Male", "Female"],
+        "Province": ["Beijing", "Shanghai", "Beijing", "Hebei", "Hebei", "Beijing"],
+    })
+
+
+def test_identical_rewrite_changes_nothing():
+    df = make_roster()
+    new_df, changed, inserted, deleted = diff_rows(df, df.copy())
+    assert (changed, inserted, deleted) == ([], [], [])
+    assert new_df.index.tolist() == df.index.tolist()
+
+
+def test_pure_delete_keeps_surviving_labels():
+    df = make_roster()
+    new_df, changed, inserted, deleted = diff_rows(df, df.drop([3, 4]).reset_index(drop=True))
+    assert (changed, inserted) == ([], [])
+    assert deleted == [3, 4]
+    assert new_df.index.tolist() == [0, 1, 2, 5]
+
+
+def test_edit_and_insert():
+    df = make_roster()
+    new = df.copy()
+    new.loc[2, "Name"] = "王五五"
+    new = pd.concat([new, pd.DataFrame([{"Name": "周九", "Gender": "Male", "Province": "Hebei"}])],
+                    ignore_index=True)
+    new_df, changed, inserted, deleted = diff_rows(df, new)
+    assert (changed, inserted, deleted) == ([2], [6], [])
+    assert new_df.loc[2, "Name"] == "王五五"
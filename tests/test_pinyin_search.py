@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from main import PinyinIndex  # noqa: E402
+
+
+def make_roster():
+    return pd.DataFrame({
+        "Name": ["张元彬", "李张元彬", "张一白", "王章雨柏"],
+        "Major": ["数学", "物理", "化学", "历史"],
+    })
+
+
+def test_query_from_first_syllable_ranks_first():
+    df = make_roster()
+    index = PinyinIndex(df)
+    for query in ("zhangyb", "zhyb", "zyb", "zhangyuan"):
+        scores = index.match_scores(df, query)
+        assert scores[0] > scores[1] > 0, query
+
+
+def test_whole_pinyin_and_initials_rank_highest():
+    df = make_roster()
+    index = PinyinIndex(df)
+    for query in ("zhangyuanbin", "zyb"):
+        assert index.match_scores(df, query).tolist()[:2] == [3, 1], query
+
+
+def test_mixed_query_scores_every_row():
+    df = make_roster()
+    # 张一白 (zhang yi bai) also starts with zhang-y-b; 王章雨柏 matches from its second syllable
+    assert PinyinIndex(df).match_scores(df, "zhangyb").tolist() == [2, 1, 2, 1]